@@ -4,13 +4,14 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+import asyncio
 from models.api_models import (
     SalesDataPoint, ForecastRequest, ItemForecast, ForecastResponse,
     BatchForecastRequest, BatchForecastResponse
 )
 from services.data_validator import DataValidator
 from services.forecast_processor import ForecastProcessor
-from services.monitoring import performance_monitor, ForecastTimer
+from services.monitoring import performance_monitor, forecast_timer
 from config.model_config import LOGGING_CONFIG
 from health_check import router as health_router
 
@@ -39,7 +40,7 @@ async def generate_forecast(request: ForecastRequest):
     """
     Generate demand forecast for a single item with performance monitoring
     """
-    with ForecastTimer(request.sku, request.user_id) as timer:
+    with forecast_timer(request.sku, request.user_id) as timer:
         try:
             logger.info(f"Generating forecast for SKU: {request.sku}, User: {request.user_id}")
             
@@ -238,7 +239,9 @@ async def clear_metrics():
     Clear all stored performance metrics
     """
     try:
-        performance_monitor.clear_metrics()
+        # The clear waits on the metrics drain thread, so keep that wait off the event loop
+        if not await asyncio.to_thread(performance_monitor.clear_metrics):
+            raise RuntimeError("Metrics could not be cleared, see the service log")
         return {
             "status": "success",
             "message": "All metrics cleared successfully",
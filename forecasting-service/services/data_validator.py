@@ -1,4 +1,4 @@
-from typing import List, NamedTuple, Dict, Any
+from typing import List, NamedTuple, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
@@ -13,7 +13,7 @@ class ValidationResult(NamedTuple):
     is_valid: bool
     insufficient_data: bool
     error_message: str = None
-    warnings: List[str] = []
+    warnings: Tuple[str, ...] = ()
     data_quality_score: float = 0.0
 
 class DataValidator:
@@ -35,7 +35,8 @@ class DataValidator:
         Returns:
             ValidationResult with validation status and warnings
         """
-        warnings = []
+        warnings: List[str] = []
+        now64 = np.datetime64(datetime.now(), 'ns')
         
         # Check if we have any data
         if not sales_data or len(sales_data) == 0:
@@ -53,21 +54,22 @@ class DataValidator:
                 error_message=f"Insufficient data points. Need at least {self.MIN_DATA_POINTS} data points, got {len(sales_data)}"
             )
         
-        # Convert to DataFrame for analysis
+        # Convert to arrays for analysis
         try:
-            df = pd.DataFrame([
-                {"date": pd.to_datetime(point.date), "quantity": point.quantity_sold}
-                for point in sales_data
-            ])
+            dates = pd.to_datetime([point.date for point in sales_data]).values
         except Exception as e:
             return ValidationResult(
                 is_valid=False,
                 insufficient_data=False,
                 error_message=f"Invalid date format in sales data: {str(e)}"
             )
+        quantities = np.array([point.quantity_sold for point in sales_data])
         
         # Sort by date
-        df = df.sort_values('date')
+        order = np.argsort(dates, kind='stable')
+        dates = dates[order]
+        quantities = quantities[order]
+        df = pd.DataFrame({"date": dates, "quantity": quantities})
         
         # Check date span
         date_span = (df['date'].max() - df['date'].min()).days
@@ -79,10 +81,10 @@ class DataValidator:
             )
         
         # Check for data quality issues
-        data_quality_score = self._calculate_data_quality_score(df, warnings)
+        data_quality_score = self._calculate_data_quality_score(df, warnings, now64)
         
         # Check for recent data (within last 30 days)
-        days_since_last_sale = (datetime.now() - df['date'].max()).days
+        days_since_last_sale = int((now64 - dates[-1]) // np.timedelta64(1, 'D'))
         if days_since_last_sale > 30:
             warnings.append(f"Last sale was {days_since_last_sale} days ago. Forecast may be less accurate.")
         
@@ -98,20 +100,21 @@ class DataValidator:
         return ValidationResult(
             is_valid=True,
             insufficient_data=False,
-            warnings=warnings,
+            warnings=tuple(warnings),
             data_quality_score=data_quality_score
         )
     
-    def _calculate_data_quality_score(self, df: pd.DataFrame, warnings: List[str]) -> float:
+    def _calculate_data_quality_score(self, df: pd.DataFrame, warnings: List[str],
+                                      now64: np.datetime64) -> float:
         """
         Advanced data quality score calculation using multiple statistical measures
         """
         score = 1.0
         
         # 1. Data completeness and frequency analysis
-        df['date_diff'] = df['date'].diff().dt.days
-        avg_gap = df['date_diff'].mean()
-        gap_std = df['date_diff'].std()
+        gaps = np.diff(df['date'].values).astype('timedelta64[D]').astype(np.int64)
+        avg_gap = gaps.mean()
+        gap_std = gaps.std(ddof=1)
         
         if avg_gap > 2:  # More than 2 days average gap
             score -= 0.15
@@ -140,20 +143,25 @@ class DataValidator:
         elif zero_ratio > 0.3:
             score -= 0.15
         
-        # 4. Trend consistency
-        trend_score = self._analyze_trend_consistency(quantities)
-        score += trend_score * 0.1  # Bonus for consistent trends
+        # Degenerate series (too short or all zeros) carry no trend, seasonality
+        # or outlier signal - skip those analyses and leave the score neutral
+        is_valid_for_stats = quantities.size >= self.MIN_DATA_POINTS and bool(np.any(quantities))
         
-        # 5. Seasonality strength
-        seasonality_score = self._analyze_seasonality_strength(df)
-        score += seasonality_score * 0.1  # Bonus for clear seasonality
-        
-        # 6. Outlier impact assessment
-        outlier_impact = self._assess_outlier_impact(quantities)
-        score -= outlier_impact * 0.2
+        if is_valid_for_stats:
+            # 4. Trend consistency
+            trend_score = self._analyze_trend_consistency(quantities)
+            score += trend_score * 0.1  # Bonus for consistent trends
+            
+            # 5. Seasonality strength
+            seasonality_score = self._analyze_seasonality_strength(df)
+            score += seasonality_score * 0.1  # Bonus for clear seasonality
+            
+            # 6. Outlier impact assessment
+            outlier_impact = self._assess_outlier_impact(quantities)
+            score -= outlier_impact * 0.2
         
         # 7. Data recency bonus
-        days_since_last = (datetime.now() - df['date'].max()).days
+        days_since_last = int((now64 - df['date'].values[-1]) // np.timedelta64(1, 'D'))
         if days_since_last <= 7:
             score += 0.05  # Recent data bonus
         elif days_since_last > 30:
@@ -167,79 +175,76 @@ class DataValidator:
         """
         Analyze trend consistency using moving averages
         """
-        try:
-            if len(quantities) < 7:
-                return 0.0
-            
-            # Calculate 3-day moving average
-            ma3 = pd.Series(quantities).rolling(window=3).mean().dropna()
-            
-            # Calculate trend changes
-            trend_changes = np.diff(np.sign(np.diff(ma3)))
-            trend_consistency = 1.0 - (np.count_nonzero(trend_changes) / len(trend_changes))
-            
-            return trend_consistency
-            
-        except:
+        if quantities.size < 7 or not np.any(quantities):
             return 0.0
+        
+        # Calculate 3-day moving average
+        ma3 = pd.Series(quantities).rolling(window=3).mean().dropna()
+        
+        # Calculate trend changes
+        trend_changes = np.diff(np.sign(np.diff(ma3)))
+        trend_consistency = 1.0 - (np.count_nonzero(trend_changes) / len(trend_changes))
+        
+        return trend_consistency
     
     def _analyze_seasonality_strength(self, df: pd.DataFrame) -> float:
         """
         Analyze seasonality strength using autocorrelation
         """
-        try:
-            if len(df) < 14:
-                return 0.0
-            
-            quantities = df['quantity'].values
-            
-            # Calculate autocorrelation at lag 7 (weekly seasonality)
-            if len(quantities) >= 14:
-                autocorr_7 = pd.Series(quantities).autocorr(lag=7)
-                if not np.isnan(autocorr_7):
-                    return abs(autocorr_7)
-            
+        quantities = df['quantity'].values
+        if quantities.size < 14 or not np.any(quantities):
             return 0.0
-            
-        except:
+        
+        # Calculate autocorrelation at lag 7 (weekly seasonality)
+        autocorr_7 = pd.Series(quantities).autocorr(lag=7)
+        if np.isnan(autocorr_7):
             return 0.0
+        
+        return abs(autocorr_7)
     
     def _assess_outlier_impact(self, quantities: np.ndarray) -> float:
         """
         Assess the impact of outliers on data quality using multiple methods
         """
-        try:
-            if len(quantities) < 4:
-                return 0.0
-            
-            # Method 1: IQR-based outliers
-            Q1, Q3 = np.percentile(quantities, [25, 75])
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            iqr_outliers = np.sum((quantities < lower_bound) | (quantities > upper_bound))
-            iqr_outlier_ratio = iqr_outliers / len(quantities)
-            
-            # Method 2: Z-score based outliers
-            z_scores = np.abs(stats.zscore(quantities))
-            z_outliers = np.sum(z_scores > 3)
-            z_outlier_ratio = z_outliers / len(quantities)
-            
-            # Method 3: Modified Z-score using median
-            median = np.median(quantities)
-            mad = np.median(np.abs(quantities - median))
-            modified_z_scores = 0.6745 * (quantities - median) / mad if mad > 0 else np.zeros_like(quantities)
-            modified_outliers = np.sum(np.abs(modified_z_scores) > 3.5)
-            modified_outlier_ratio = modified_outliers / len(quantities)
-            
-            # Combine methods (take average)
-            combined_outlier_ratio = (iqr_outlier_ratio + z_outlier_ratio + modified_outlier_ratio) / 3
-            
-            return min(1.0, combined_outlier_ratio * 2)  # Scale impact
-            
-        except:
+        if quantities.size < 4 or not np.any(quantities):
             return 0.0
+        
+        # Compute the shared summary statistics once
+        mean = quantities.mean()
+        std = quantities.std()
+        median = np.median(quantities)
+        mad = np.median(np.abs(quantities - median))
+        Q1, Q3 = self._quartiles(quantities)
+        IQR = Q3 - Q1
+        
+        # Method 1: IQR-based outliers
+        iqr_mask = (quantities < Q1 - 1.5 * IQR) | (quantities > Q3 + 1.5 * IQR)
+        iqr_outlier_ratio = iqr_mask.mean()
+        
+        # Method 2: Z-score based outliers
+        z_mask = np.abs(quantities - mean) > 3 * std
+        z_outlier_ratio = z_mask.mean()
+        
+        # Method 3: Modified Z-score using median
+        if mad > 0:
+            modified_mask = np.abs(0.6745 * (quantities - median) / mad) > 3.5
+            modified_outlier_ratio = modified_mask.mean()
+        else:
+            modified_outlier_ratio = 0.0
+        
+        # Combine methods (take average)
+        combined_outlier_ratio = (iqr_outlier_ratio + z_outlier_ratio + modified_outlier_ratio) / 3
+        
+        return min(1.0, combined_outlier_ratio * 2)  # Scale impact
+    
+    @staticmethod
+    def _quartiles(quantities: np.ndarray) -> Tuple[float, float]:
+        """
+        Lower and upper quartiles via O(N) selection instead of a full percentile sort
+        """
+        k1, k3 = quantities.size // 4, (3 * quantities.size) // 4
+        partitioned = np.partition(quantities, [k1, k3])
+        return partitioned[k1], partitioned[k3]
     
     def _has_significant_outliers(self, df: pd.DataFrame) -> bool:
         """
@@ -251,8 +256,7 @@ class DataValidator:
         quantities = df['quantity'].values
         
         # Method 1: IQR method
-        Q1 = np.percentile(quantities, 25)
-        Q3 = np.percentile(quantities, 75)
+        Q1, Q3 = self._quartiles(quantities)
         IQR = Q3 - Q1
         
         lower_bound = Q1 - 1.5 * IQR
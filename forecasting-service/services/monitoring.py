@@ -2,21 +2,46 @@
 Monitoring and metrics collection for forecasting service
 """
 
+import os
 import time
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-import json
+import logging.handlers
+import itertools
+import atexit
+import bisect
+from operator import attrgetter
+from typing import Dict, Any, Iterator, List, Optional
+from datetime import datetime
+import orjson
 from dataclasses import dataclass, asdict
-from collections import defaultdict, deque
+from contextlib import contextmanager
+from collections import Counter, defaultdict, deque
 import threading
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
+import numpy as np
+from services.monitoring_kernels import model_stats
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Wall clock cached by a daemon thread, so recording a forecast never queries the system clock
+CLOCK_RESOLUTION_S = 0.1
+_now_ns = time.time_ns()
+
+def _update_now():
+    """Refresh the cached wall clock every CLOCK_RESOLUTION_S"""
+    global _now_ns
+    while True:
+        time.sleep(CLOCK_RESOLUTION_S)
+        _now_ns = time.time_ns()
+
+threading.Thread(target=_update_now, name="metrics-clock", daemon=True).start()
+
+@dataclass(slots=True, frozen=True)
 class ForecastMetrics:
     """Metrics for a single forecast operation"""
-    timestamp: datetime
+    timestamp: int  # epoch nanoseconds
     sku: str
     user_id: str
     model_used: str
@@ -31,166 +56,628 @@ class ForecastMetrics:
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for logging/storage"""
         data = asdict(self)
-        data['timestamp'] = self.timestamp.isoformat()
+        data['timestamp'] = datetime.fromtimestamp(self.timestamp / 1e9).isoformat()
         return data
 
+# Packed history record; strings are interned into ids, NO_STRING_ID marks a missing error message
+METRICS_DTYPE = np.dtype([
+    ('ts', 'i8'),             # epoch microseconds
+    ('sku_id', 'i4'),
+    ('user_id', 'i4'),
+    ('model_id', 'i4'),
+    ('proc_ms', 'f8'),
+    ('data_points', 'i4'),
+    ('forecast_days', 'i2'),
+    ('conf', 'f8'),
+    ('qual', 'f8'),
+    ('success', '?'),
+    ('err_id', 'i4'),
+])
+NO_STRING_ID = -1
+STRING_ID_FIELDS = ('sku_id', 'user_id', 'model_id', 'err_id')
+
+# Hour buckets are keyed by integer epoch hour
+NS_PER_HOUR = 3_600_000_000_000
+
+class _HourBucket:
+    """Running aggregates for all forecasts recorded within one clock hour"""
+    
+    __slots__ = ('hour', 'count', 'success', 'sum_time', 'min_time', 'max_time', 'slow',
+                 'sum_confidence', 'sum_quality', 'low_confidence', 'low_quality',
+                 'model_usage', 'errors')
+    
+    def __init__(self, hour: int):
+        self.hour = hour
+        self.count = 0
+        self.success = 0
+        self.sum_time = 0.0
+        self.min_time = float('inf')
+        self.max_time = float('-inf')
+        self.slow = 0
+        self.sum_confidence = 0.0
+        self.sum_quality = 0.0
+        self.low_confidence = 0
+        self.low_quality = 0
+        self.model_usage = Counter()
+        self.errors = Counter()
+    
+    def add(self, metrics: ForecastMetrics, slow_threshold_ms: float,
+            low_confidence_threshold: float, low_quality_threshold: float):
+        """Fold a single forecast into the running aggregates"""
+        processing_time = metrics.processing_time_ms
+        self.count += 1
+        self.sum_time += processing_time
+        if processing_time < self.min_time:
+            self.min_time = processing_time
+        if processing_time > self.max_time:
+            self.max_time = processing_time
+        if processing_time > slow_threshold_ms:
+            self.slow += 1
+        
+        if metrics.success:
+            self.success += 1
+            self.sum_confidence += metrics.confidence_score
+            self.sum_quality += metrics.data_quality_score
+            if metrics.confidence_score < low_confidence_threshold:
+                self.low_confidence += 1
+            if metrics.data_quality_score < low_quality_threshold:
+                self.low_quality += 1
+            self.model_usage[metrics.model_used] += 1
+        elif metrics.error_message:
+            self.errors[metrics.error_message] += 1
+
+_bucket_hour = attrgetter('hour')
+
+class _ModelColumns:
+    """Growable columnar buffer of one model's forecast runs; success flags are bit-packed"""
+    
+    __slots__ = ('n', 'cap', 'conf', 'qual', 'time', 'success')
+    
+    INITIAL_CAPACITY = 256
+    
+    def __init__(self):
+        self.n = 0
+        self.cap = self.INITIAL_CAPACITY
+        self.conf = np.empty(self.cap)
+        self.qual = np.empty(self.cap)
+        self.time = np.empty(self.cap)
+        self.success = np.zeros(self.cap // 8, dtype=np.uint8)
+    
+    def append(self, confidence: float, quality: float, processing_time: float, success: bool):
+        """Write one run by index, doubling every column when full"""
+        n = self.n
+        if n == self.cap:
+            self.cap *= 2
+            self.conf = self._grow(self.conf, self.cap)
+            self.qual = self._grow(self.qual, self.cap)
+            self.time = self._grow(self.time, self.cap)
+            self.success = self._grow(self.success, self.cap // 8)
+        
+        self.conf[n] = confidence
+        self.qual[n] = quality
+        self.time[n] = processing_time
+        if success:
+            self.success[n >> 3] |= 0x80 >> (n & 7)
+        self.n = n + 1
+    
+    def snapshot(self) -> tuple:
+        """Copies of the filled (confidence, quality, time, success) columns"""
+        n = self.n
+        success = np.unpackbits(self.success, count=n).astype(bool)
+        return self.conf[:n].copy(), self.qual[:n].copy(), self.time[:n].copy(), success
+    
+    @staticmethod
+    def _grow(column: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.zeros(capacity, dtype=column.dtype)
+        grown[:column.size] = column
+        return grown
+
+class _MetricsStore:
+    """Recorded metrics: a history ring in write order plus the running aggregates"""
+    
+    __slots__ = ('lock', 'history', 'history_count', 'model_performance', 'error_counts', 'buckets')
+    
+    def __init__(self, max_history_size: int, max_buckets: int):
+        self.lock = threading.Lock()
+        self.history = np.empty(max_history_size, dtype=METRICS_DTYPE)
+        self.history_count = 0
+        self.model_performance = defaultdict(_ModelColumns)
+        self.error_counts = Counter()
+        self.buckets = deque(maxlen=max_buckets)
+    
+    def append_history(self, record: tuple):
+        """Overwrite the oldest slot of the history ring with a packed record"""
+        self.history[self.history_count % self.history.size] = record
+        self.history_count += 1
+    
+    def filled_history(self) -> np.ndarray:
+        """View of the filled slots of the history ring, in slot order"""
+        return self.history[:min(self.history_count, self.history.size)]
+    
+    def history_snapshot(self) -> np.ndarray:
+        """Copy of the history ring in write order, oldest record first"""
+        if self.history_count <= self.history.size:
+            return self.history[:self.history_count].copy()
+        
+        # Once wrapped, the next slot to overwrite holds the oldest record
+        oldest = self.history_count % self.history.size
+        return np.concatenate((self.history[oldest:], self.history[:oldest]))
+    
+    def bucket_for(self, hour: int) -> _HourBucket:
+        """Return the bucket for an epoch hour, rolling a new one on hour change"""
+        buckets = self.buckets
+        if not buckets or buckets[-1].hour < hour:
+            buckets.append(_HourBucket(hour))
+            return buckets[-1]
+        
+        # Late arrivals from a previous hour land in their own bucket when still retained
+        position = bisect.bisect_right(buckets, hour, key=_bucket_hour) - 1
+        return buckets[max(position, 0)]
+
+# kind -> (sampled message, roll-up message, picker for the worst value)
+_WARNING_KINDS = {
+    'slow': ("Slow forecast request: %.2fms for SKU %s",
+             "%d slow forecast requests in last %ds, max %.2fms", max),
+    'low_confidence': ("Low confidence forecast: %.3f for SKU %s",
+                       "%d low confidence forecasts in last %ds, min %.3f", min),
+    'low_quality': ("Low data quality: %.3f for SKU %s",
+                    "%d low data quality forecasts in last %ds, min %.3f", min),
+}
+
+class _ForwardHandler(logging.Handler):
+    """Hand dequeued records to a logger so its configured handlers do the I/O"""
+    
+    def __init__(self, target: logging.Logger):
+        super().__init__()
+        self.target = target
+    
+    def emit(self, record: logging.LogRecord):
+        self.target.handle(record)
+
+class _WarningThrottler:
+    """
+    Sampled, rolled-up channel for repeated forecast warnings
+    
+    The first event of each kind per interval and every sample_every-th after it
+    are logged individually; a daemon thread logs one roll-up per kind each
+    interval. Records pass through a QueueHandler, so submitters never wait on I/O.
+    """
+    
+    def __init__(self, target: logging.Logger, interval_s: int = 10, sample_every: int = 100):
+        self.interval_s = interval_s
+        self.sample_every = sample_every
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._worst: Dict[str, float] = {}
+        
+        log_queue = queue.SimpleQueue()
+        self._channel = logging.getLogger(f"{target.name}.warnings")
+        self._channel.propagate = False
+        if not self._channel.handlers:
+            self._channel.addHandler(logging.handlers.QueueHandler(log_queue))
+            listener = logging.handlers.QueueListener(log_queue, _ForwardHandler(target))
+            listener.start()
+            atexit.register(listener.stop)
+        
+        threading.Thread(target=self._flush_loop, name="metrics-warnings", daemon=True).start()
+    
+    def submit(self, kind: str, value: float, sku: str):
+        """Count one warning event, logging it only when it is sampled"""
+        message, _, pick = _WARNING_KINDS[kind]
+        with self._lock:
+            count = self._counts[kind] + 1
+            self._counts[kind] = count
+            self._worst[kind] = value if count == 1 else pick(self._worst[kind], value)
+        
+        if (count - 1) % self.sample_every == 0:
+            self._channel.warning(message, value, sku)
+    
+    def flush(self):
+        """Log a roll-up for every kind that repeated since the last flush"""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            worst, self._worst = self._worst, {}
+        
+        for kind, count in counts.items():
+            if count > 1:
+                self._channel.warning(_WARNING_KINDS[kind][1], count, self.interval_s, worst[kind])
+    
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval_s)
+            self.flush()
+
 class PerformanceMonitor:
     """
     Monitor and collect performance metrics for the forecasting service
+    
+    Producers only enqueue onto a lock-free inbox; a single drain thread folds
+    the metrics into one store, so its history is always in write order. Reads are
+    eventually consistent - call flush() when every queued metric must be visible.
     """
     
+    PROCESSING_TIMES_SIZE = 100  # Last 100 processing times
+    MAX_SUMMARY_HOURS = 168  # Longest window served by /metrics/performance
+    
     def __init__(self, max_history_size: int = 1000):
         self.max_history_size = max_history_size
-        self.metrics_history = deque(maxlen=max_history_size)
-        self.model_performance = defaultdict(list)
-        self.error_counts = defaultdict(int)
-        self.processing_times = deque(maxlen=100)  # Last 100 processing times
-        self._lock = threading.Lock()
+        
+        # Written only by the drain thread; the lock keeps readers' snapshots consistent
+        self._store = _MetricsStore(max_history_size, self.MAX_SUMMARY_HOURS + 1)
+        
+        # Interned sku/user/model/error strings; compacted to the ids still
+        # referenced once every ring slot may have been overwritten
+        self._string_ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._records_since_compaction = 0
+        
+        # Ring of recent processing times, written only by the drain thread;
+        # the valid window is self._pt[:min(self._pt_idx, PROCESSING_TIMES_SIZE)]
+        self._pt = np.zeros(self.PROCESSING_TIMES_SIZE, dtype='f4')
+        self._pt_idx = 0
+        
+        # Bumped after every applied metric; summaries are reused while it and the hour are unchanged
+        self._version = 0
+        self._summary_cache: Dict[int, tuple] = {}
         
         # Performance thresholds
         self.slow_request_threshold_ms = 5000  # 5 seconds
         self.low_confidence_threshold = 0.3
         self.low_quality_threshold = 0.5
+        self._warn_throttler = _WarningThrottler(logger)
+        
+        # Single worker serializes snapshots so they never overlap on the same file
+        self._snapshot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-snapshot")
+        
+        # SimpleQueue put/get are atomic C operations, so producers never take a Python lock
+        self._inbox = queue.SimpleQueue()
+        self._drain_thread = threading.Thread(target=self._drain, name="metrics-drain", daemon=True)
+        self._drain_thread.start()
     
     def record_forecast_metrics(self, metrics: ForecastMetrics):
         """Record metrics for a forecast operation"""
-        with self._lock:
-            self.metrics_history.append(metrics)
-            self.model_performance[metrics.model_used].append({
-                'confidence': metrics.confidence_score,
-                'quality': metrics.data_quality_score,
-                'processing_time': metrics.processing_time_ms,
-                'success': metrics.success
-            })
-            self.processing_times.append(metrics.processing_time_ms)
-            
-            if not metrics.success:
-                self.error_counts[metrics.error_message or 'unknown_error'] += 1
-            
-            # Log performance issues
-            if metrics.processing_time_ms > self.slow_request_threshold_ms:
-                logger.warning(f"Slow forecast request: {metrics.processing_time_ms:.2f}ms for SKU {metrics.sku}")
+        self._inbox.put_nowait(metrics)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every metric queued before this call has been applied"""
+        applied = threading.Event()
+        self._inbox.put_nowait(applied)
+        return applied.wait(timeout)
+    
+    def _drain(self):
+        """Drain thread loop applying queued metrics; flush() markers are Events, callables run in order"""
+        while True:
+            item = self._inbox.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
             
-            if metrics.success and metrics.confidence_score < self.low_confidence_threshold:
-                logger.warning(f"Low confidence forecast: {metrics.confidence_score:.3f} for SKU {metrics.sku}")
+            if callable(item):
+                try:
+                    item()
+                except Exception as e:
+                    logger.error("Queued metrics task failed: %s", e)
+                continue
             
-            if metrics.success and metrics.data_quality_score < self.low_quality_threshold:
-                logger.warning(f"Low data quality: {metrics.data_quality_score:.3f} for SKU {metrics.sku}")
+            try:
+                self._apply_metrics(item)
+            except Exception as e:
+                logger.error("Failed to record forecast metrics for SKU %s: %s", item.sku, e)
     
-    def get_performance_summary(self, hours: int = 24) -> Dict[str, Any]:
-        """Get performance summary for the last N hours"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+    def _apply_metrics(self, metrics: ForecastMetrics):
+        """Fold one forecast's metrics into the store (drain thread only)"""
+        record = (
+            metrics.timestamp // 1000,
+            self._intern(metrics.sku),
+            self._intern(metrics.user_id),
+            self._intern(metrics.model_used),
+            metrics.processing_time_ms,
+            metrics.data_points,
+            metrics.forecast_days,
+            metrics.confidence_score,
+            metrics.data_quality_score,
+            metrics.success,
+            NO_STRING_ID if metrics.error_message is None else self._intern(metrics.error_message)
+        )
         
-        with self._lock:
-            recent_metrics = [m for m in self.metrics_history if m.timestamp >= cutoff_time]
-            
-            if not recent_metrics:
-                return {"message": "No metrics available for the specified time period"}
+        store = self._store
+        with store.lock:
+            store.append_history(record)
+            store.model_performance[metrics.model_used].append(
+                metrics.confidence_score, metrics.data_quality_score,
+                metrics.processing_time_ms, metrics.success
+            )
             
-            total_requests = len(recent_metrics)
-            successful_requests = sum(1 for m in recent_metrics if m.success)
-            failed_requests = total_requests - successful_requests
-            
-            # Processing time statistics
-            processing_times = [m.processing_time_ms for m in recent_metrics]
-            avg_processing_time = sum(processing_times) / len(processing_times)
-            max_processing_time = max(processing_times)
-            min_processing_time = min(processing_times)
+            if not metrics.success:
+                store.error_counts[metrics.error_message or 'unknown_error'] += 1
             
-            # Confidence and quality statistics
-            successful_metrics = [m for m in recent_metrics if m.success]
-            if successful_metrics:
-                avg_confidence = sum(m.confidence_score for m in successful_metrics) / len(successful_metrics)
-                avg_quality = sum(m.data_quality_score for m in successful_metrics) / len(successful_metrics)
-                
-                # Model usage statistics
-                model_usage = defaultdict(int)
-                for m in successful_metrics:
-                    model_usage[m.model_used] += 1
-            else:
-                avg_confidence = 0
-                avg_quality = 0
-                model_usage = {}
+            store.bucket_for(metrics.timestamp // NS_PER_HOUR).add(
+                metrics, self.slow_request_threshold_ms,
+                self.low_confidence_threshold, self.low_quality_threshold
+            )
+        
+        self._pt[self._pt_idx % self.PROCESSING_TIMES_SIZE] = metrics.processing_time_ms
+        self._pt_idx += 1
+        self._version += 1
+        
+        self._records_since_compaction += 1
+        if self._records_since_compaction >= self.max_history_size:
+            self._compact_strings()
+        
+        # Log performance issues; isEnabledFor is cached by logging and skips all checks when muted
+        if not logger.isEnabledFor(logging.WARNING):
+            return
+        
+        if metrics.processing_time_ms > self.slow_request_threshold_ms:
+            self._warn_throttler.submit('slow', metrics.processing_time_ms, metrics.sku)
+        
+        if metrics.success and metrics.confidence_score < self.low_confidence_threshold:
+            self._warn_throttler.submit('low_confidence', metrics.confidence_score, metrics.sku)
+        
+        if metrics.success and metrics.data_quality_score < self.low_quality_threshold:
+            self._warn_throttler.submit('low_quality', metrics.data_quality_score, metrics.sku)
+    
+    def _intern(self, value: str) -> int:
+        """Map a string to its stable integer id, registering it on first sight (drain thread only)"""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+    
+    def _compact_strings(self):
+        """Rebuild the intern table from the ids the history ring still references (drain thread only)"""
+        with self._store.lock:
+            ring = self._store.filled_history()
+            live_ids = np.unique(np.concatenate([ring[field] for field in STRING_ID_FIELDS]))
+            live_ids = live_ids[live_ids != NO_STRING_ID]
             
-            # Error analysis
-            recent_errors = defaultdict(int)
-            for m in recent_metrics:
-                if not m.success and m.error_message:
-                    recent_errors[m.error_message] += 1
+            # The extra trailing slot maps NO_STRING_ID (-1) onto itself
+            remap = np.full(len(self._strings) + 1, NO_STRING_ID, dtype='i4')
+            remap[live_ids] = np.arange(live_ids.size, dtype='i4')
+            for field in STRING_ID_FIELDS:
+                ring[field] = remap[ring[field]]
             
-            return {
-                "time_period_hours": hours,
-                "total_requests": total_requests,
-                "successful_requests": successful_requests,
-                "failed_requests": failed_requests,
-                "success_rate": successful_requests / total_requests if total_requests > 0 else 0,
-                "performance": {
-                    "avg_processing_time_ms": round(avg_processing_time, 2),
-                    "max_processing_time_ms": round(max_processing_time, 2),
-                    "min_processing_time_ms": round(min_processing_time, 2),
-                    "slow_requests": sum(1 for t in processing_times if t > self.slow_request_threshold_ms)
-                },
-                "forecast_quality": {
-                    "avg_confidence_score": round(avg_confidence, 3),
-                    "avg_data_quality_score": round(avg_quality, 3),
-                    "low_confidence_forecasts": sum(1 for m in successful_metrics if m.confidence_score < self.low_confidence_threshold),
-                    "low_quality_data": sum(1 for m in successful_metrics if m.data_quality_score < self.low_quality_threshold)
-                },
-                "model_usage": dict(model_usage),
-                "recent_errors": dict(recent_errors)
-            }
+            # New objects rather than in-place edits, so readers holding the old table stay consistent
+            self._strings = [self._strings[string_id] for string_id in live_ids]
+            self._string_ids = {value: string_id for string_id, value in enumerate(self._strings)}
+        
+        self._records_since_compaction = 0
+    
+    def _snapshot_history(self) -> tuple:
+        """
+        Copy the history in write order, oldest record first
+        
+        Returns (history, strings); the intern table is captured under the same
+        lock, so the ids in history always resolve against strings.
+        """
+        with self._store.lock:
+            return self._store.history_snapshot(), self._strings
+    
+    def _record_to_dict(self, record: np.void, strings: List[str]) -> Dict[str, Any]:
+        """Rebuild the ForecastMetrics.to_dict() shape from a packed history record"""
+        err_id = int(record['err_id'])
+        return {
+            'timestamp': datetime.fromtimestamp(int(record['ts']) / 1_000_000).isoformat(),
+            'sku': strings[record['sku_id']],
+            'user_id': strings[record['user_id']],
+            'model_used': strings[record['model_id']],
+            'processing_time_ms': float(record['proc_ms']),
+            'data_points': int(record['data_points']),
+            'forecast_days': int(record['forecast_days']),
+            'confidence_score': float(record['conf']),
+            'data_quality_score': float(record['qual']),
+            'success': bool(record['success']),
+            'error_message': None if err_id == NO_STRING_ID else strings[err_id]
+        }
+    
+    @property
+    def error_counts(self) -> Counter:
+        """Copy of the error counts"""
+        with self._store.lock:
+            return Counter(self._store.error_counts)
+    
+    def get_performance_summary(self, hours: int = 24) -> Dict[str, Any]:
+        """
+        Get performance summary for the last N hours
+        
+        Aggregates are read from the hourly buckets, so the window is rounded
+        out to whole clock hours and the cost is independent of request volume.
+        Repeated polls return the cached summary until a metric arrives or the hour changes.
+        """
+        version = self._version
+        current_hour = time.time_ns() // NS_PER_HOUR
+        cached = self._summary_cache.get(hours)
+        if cached is not None and cached[0] == version and cached[1] == current_hour:
+            return cached[2]
+        
+        # A bucket is in the window unless its whole hour ends before the cutoff
+        oldest_excluded_hour = current_hour - hours - 1
+        
+        total_requests = 0
+        successful_requests = 0
+        total_time = 0.0
+        min_processing_time = float('inf')
+        max_processing_time = float('-inf')
+        slow_requests = 0
+        total_confidence = 0.0
+        total_quality = 0.0
+        low_confidence_forecasts = 0
+        low_quality_data = 0
+        model_usage = Counter()
+        recent_errors = Counter()
+        
+        store = self._store
+        with store.lock:
+            # Buckets are kept in hour order, so binary search for the window edge
+            start = bisect.bisect_right(store.buckets, oldest_excluded_hour, key=_bucket_hour)
+            for bucket in itertools.islice(store.buckets, start, None):
+                total_requests += bucket.count
+                successful_requests += bucket.success
+                total_time += bucket.sum_time
+                min_processing_time = min(min_processing_time, bucket.min_time)
+                max_processing_time = max(max_processing_time, bucket.max_time)
+                slow_requests += bucket.slow
+                total_confidence += bucket.sum_confidence
+                total_quality += bucket.sum_quality
+                low_confidence_forecasts += bucket.low_confidence
+                low_quality_data += bucket.low_quality
+                model_usage.update(bucket.model_usage)
+                recent_errors.update(bucket.errors)
+        
+        if not total_requests:
+            summary = {"message": "No metrics available for the specified time period"}
+            self._summary_cache[hours] = (version, current_hour, summary)
+            return summary
+        
+        if successful_requests:
+            avg_confidence = total_confidence / successful_requests
+            avg_quality = total_quality / successful_requests
+        else:
+            avg_confidence = 0
+            avg_quality = 0
+        
+        summary = {
+            "time_period_hours": hours,
+            "total_requests": total_requests,
+            "successful_requests": successful_requests,
+            "failed_requests": total_requests - successful_requests,
+            "success_rate": successful_requests / total_requests,
+            "performance": {
+                "avg_processing_time_ms": round(total_time / total_requests, 2),
+                "max_processing_time_ms": round(max_processing_time, 2),
+                "min_processing_time_ms": round(min_processing_time, 2),
+                "slow_requests": slow_requests
+            },
+            "forecast_quality": {
+                "avg_confidence_score": round(avg_confidence, 3),
+                "avg_data_quality_score": round(avg_quality, 3),
+                "low_confidence_forecasts": low_confidence_forecasts,
+                "low_quality_data": low_quality_data
+            },
+            "model_usage": dict(model_usage),
+            "recent_errors": dict(recent_errors)
+        }
+        self._summary_cache[hours] = (version, current_hour, summary)
+        return summary
     
     def get_model_performance_comparison(self) -> Dict[str, Any]:
         """Compare performance across different models"""
-        with self._lock:
-            comparison = {}
+        with self._store.lock:
+            model_columns = {
+                model_name: columns.snapshot()
+                for model_name, columns in self._store.model_performance.items()
+            }
+        
+        comparison = {}
+        
+        for model_name, (confidence, quality, processing_time, success) in model_columns.items():
+            total_runs = success.size
+            successful_runs = int(np.count_nonzero(success))
+            if not successful_runs:
+                continue
             
-            for model_name, performances in self.model_performance.items():
-                if not performances:
-                    continue
-                
-                successful_runs = [p for p in performances if p['success']]
-                
-                if successful_runs:
-                    comparison[model_name] = {
-                        "total_runs": len(performances),
-                        "successful_runs": len(successful_runs),
-                        "success_rate": len(successful_runs) / len(performances),
-                        "avg_confidence": sum(p['confidence'] for p in successful_runs) / len(successful_runs),
-                        "avg_quality": sum(p['quality'] for p in successful_runs) / len(successful_runs),
-                        "avg_processing_time_ms": sum(p['processing_time'] for p in successful_runs) / len(successful_runs),
-                        "confidence_std": self._calculate_std([p['confidence'] for p in successful_runs]),
-                        "quality_std": self._calculate_std([p['quality'] for p in successful_runs])
-                    }
+            avg_confidence, avg_quality, avg_processing_time, confidence_std, quality_std = model_stats(
+                confidence[success], quality[success], processing_time[success]
+            )
             
-            return comparison
+            comparison[model_name] = {
+                "total_runs": total_runs,
+                "successful_runs": successful_runs,
+                "success_rate": successful_runs / total_runs,
+                "avg_confidence": avg_confidence,
+                "avg_quality": avg_quality,
+                "avg_processing_time_ms": avg_processing_time,
+                "confidence_std": confidence_std,
+                "quality_std": quality_std
+            }
+        
+        return comparison
     
-    def _calculate_std(self, values: list) -> float:
-        """Calculate standard deviation"""
-        if len(values) < 2:
-            return 0.0
+    def iter_export_metrics(self, format: str = 'json') -> Iterator[bytes]:
+        """Stream exported metrics as encoded chunks, one record at a time"""
+        if format.lower() != 'json':
+            raise ValueError(f"Unsupported export format: {format}")
         
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / (len(values) - 1)
-        return variance ** 0.5
+        return self._iter_json(*self._snapshot_history())
+    
+    def _iter_json(self, history: np.ndarray, strings: List[str]) -> Iterator[bytes]:
+        """Encode packed history records as chunks of a JSON array"""
+        yield b'['
+        for position, record in enumerate(history):
+            if position:
+                yield b','
+            yield orjson.dumps(self._record_to_dict(record, strings))
+        yield b']'
     
     def export_metrics(self, format: str = 'json') -> str:
         """Export metrics in specified format"""
-        with self._lock:
-            if format.lower() == 'json':
-                metrics_data = [m.to_dict() for m in self.metrics_history]
-                return json.dumps(metrics_data, indent=2, default=str)
-            else:
-                raise ValueError(f"Unsupported export format: {format}")
-    
-    def clear_metrics(self):
-        """Clear all stored metrics"""
-        with self._lock:
-            self.metrics_history.clear()
-            self.model_performance.clear()
-            self.error_counts.clear()
-            self.processing_times.clear()
-            logger.info("All metrics cleared")
+        return b''.join(self.iter_export_metrics(format)).decode()
+    
+    def snapshot(self, path: str) -> Future:
+        """
+        Export metrics to a JSON file on the snapshot worker
+        
+        The history is copied before returning; the file is written next to path
+        and swapped in with os.replace, so readers never see a partial file.
+        """
+        return self._snapshot_executor.submit(self._write_snapshot, *self._snapshot_history(), path)
+    
+    def _write_snapshot(self, history: np.ndarray, strings: List[str], path: str):
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.writelines(self._iter_json(history, strings))
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Don't leave a partial snapshot behind next to the real one
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+    
+    def clear_metrics(self, timeout: float = 5.0) -> bool:
+        """
+        Clear all stored metrics, including any still queued for the drain thread
+        
+        Returns False when the clear failed or did not finish within timeout.
+        """
+        # Runs on the drain thread after everything queued so far, so it never races interning
+        cleared = Future()
+        self._inbox.put_nowait(partial(self._clear, cleared))
+        try:
+            cleared.result(timeout)
+        except FutureTimeoutError:
+            logger.error("Timed out after %ss waiting for metrics to clear", timeout)
+            return False
+        except Exception as e:
+            logger.error("Failed to clear metrics: %s", e)
+            return False
+        
+        logger.info("All metrics cleared")
+        return True
+    
+    def _clear(self, cleared: Future):
+        try:
+            store = self._store
+            with store.lock:
+                store.history_count = 0
+                store.model_performance.clear()
+                store.error_counts.clear()
+                store.buckets.clear()
+                self._strings = []
+                self._string_ids = {}
+            
+            self._records_since_compaction = 0
+            self._pt[:] = 0.0
+            self._pt_idx = 0
+            self._version += 1
+        except Exception as e:
+            cleared.set_exception(e)
+        else:
+            cleared.set_result(None)
 
 # Global monitor instance
 performance_monitor = PerformanceMonitor()
@@ -198,31 +685,30 @@ performance_monitor = PerformanceMonitor()
 class ForecastTimer:
     """Context manager for timing forecast operations"""
     
+    __slots__ = ('sku', 'user_id', '_t0')
+    
     def __init__(self, sku: str, user_id: str):
         self.sku = sku
         self.user_id = user_id
-        self.start_time = None
-        self.end_time = None
+        self._t0 = 0
     
     def __enter__(self):
-        self.start_time = time.time()
+        self._t0 = time.perf_counter_ns()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.end_time = time.time()
+        pass
     
     def get_duration_ms(self) -> float:
-        """Get duration in milliseconds"""
-        if self.start_time and self.end_time:
-            return (self.end_time - self.start_time) * 1000
-        return 0.0
+        """Get milliseconds elapsed since the timer was entered"""
+        return (time.perf_counter_ns() - self._t0) / 1e6
     
     def record_metrics(self, model_used: str, data_points: int, forecast_days: int,
                       confidence_score: float, data_quality_score: float,
                       success: bool, error_message: Optional[str] = None):
         """Record metrics for this forecast operation"""
         metrics = ForecastMetrics(
-            timestamp=datetime.now(),
+            timestamp=_now_ns,
             sku=self.sku,
             user_id=self.user_id,
             model_used=model_used,
@@ -235,4 +721,27 @@ class ForecastTimer:
             error_message=error_message
         )
         
-        performance_monitor.record_forecast_metrics(metrics)
\ No newline at end of file
+        performance_monitor.record_forecast_metrics(metrics)
+
+# Reusable timers for forecast_timer(); deque append/pop are atomic under the GIL
+_timer_pool = deque(maxlen=64)
+
+@contextmanager
+def forecast_timer(sku: str, user_id: str):
+    """
+    Pooled alternative to ForecastTimer that recycles timer instances
+    
+    The yielded timer goes back to the pool on exit and must not be used afterwards.
+    """
+    try:
+        timer = _timer_pool.pop()
+        timer.sku = sku
+        timer.user_id = user_id
+    except IndexError:
+        timer = ForecastTimer(sku, user_id)
+    
+    timer._t0 = time.perf_counter_ns()
+    try:
+        yield timer
+    finally:
+        _timer_pool.append(timer)
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+Numerical kernels for monitoring statistics
+"""
+
+import logging
+from typing import Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logger.warning("Numba not available, using NumPy monitoring statistics")
+
+def _model_stats_numpy(confidence: np.ndarray, quality: np.ndarray,
+                       processing_time: np.ndarray) -> Tuple[float, float, float, float, float]:
+    """
+    Fused per-model statistics over the successful runs of one model
+    
+    Returns (avg_confidence, avg_quality, avg_processing_time, confidence_std, quality_std)
+    with sample (ddof=1) standard deviations.
+    """
+    n = confidence.size
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0
+    
+    confidence_std = float(confidence.std(ddof=1)) if n > 1 else 0.0
+    quality_std = float(quality.std(ddof=1)) if n > 1 else 0.0
+    return (float(confidence.mean()), float(quality.mean()), float(processing_time.mean()),
+            confidence_std, quality_std)
+
+# model_stats resolves to the JIT kernel when Numba is installed, with identical semantics
+if NUMBA_AVAILABLE:
+    # Explicit signature compiles eagerly at import, so the first request never pays for the JIT
+    @njit('Tuple((f8,f8,f8,f8,f8))(f8[:],f8[:],f8[:])', cache=True, fastmath=True, boundscheck=False)
+    def _model_stats_jit(confidence, quality, processing_time):
+        n = confidence.size
+        if n == 0:
+            return 0.0, 0.0, 0.0, 0.0, 0.0
+        
+        # Single pass: Welford updates for confidence/quality, plain sum for time
+        mean_c = 0.0
+        mean_q = 0.0
+        m2_c = 0.0
+        m2_q = 0.0
+        sum_t = 0.0
+        for i in range(n):
+            k = i + 1
+            delta_c = confidence[i] - mean_c
+            mean_c += delta_c / k
+            m2_c += delta_c * (confidence[i] - mean_c)
+            delta_q = quality[i] - mean_q
+            mean_q += delta_q / k
+            m2_q += delta_q * (quality[i] - mean_q)
+            sum_t += processing_time[i]
+        
+        if n > 1:
+            std_c = (m2_c / (n - 1)) ** 0.5
+            std_q = (m2_q / (n - 1)) ** 0.5
+        else:
+            std_c = 0.0
+            std_q = 0.0
+        return mean_c, mean_q, sum_t / n, std_c, std_q
+    
+    model_stats = _model_stats_jit
+else:
+    model_stats = _model_stats_numpy
+
@@ -7,8 +7,9 @@ Handles Visual C++ Build Tools installation and configuration
 import subprocess
 import sys
 import os
-import winreg
+import json
 import logging
+import re
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO)
@@ -17,58 +18,100 @@ logger = logging.getLogger(__name__)
 class WindowsSetup:
     """Handle Windows-specific setup requirements"""
     
+    SOURCE_ONLY_PACKAGES = {"pystan", "cython"}
+    
     def __init__(self):
         self.vs_installer_url = "https://aka.ms/vs/17/release/vs_buildtools.exe"
         self.build_tools_installed = False
+        self.vswhere_path = os.path.join(
+            os.environ.get("ProgramFiles(x86)", r"C:\Program Files (x86)"),
+            "Microsoft Visual Studio", "Installer", "vswhere.exe"
+        )
+        self.vs_instances_path = os.path.join(
+            os.environ.get("ProgramData", r"C:\ProgramData"),
+            "Microsoft", "VisualStudio", "Packages", "_Instances"
+        )
+        self.vswhere_cache_path = Path.home() / ".cache" / "relinq" / "vswhere.json"
         
     def check_visual_studio_installation(self):
-        """Check if Visual Studio or Build Tools are installed"""
+        """Check if Visual Studio or Build Tools with the C++ toolset are installed"""
         logger.info("Checking for Visual Studio installations...")
         
-        # Check registry for Visual Studio installations
+        # Reuse the last discovery while no instance's state.json has changed and its paths still exist
+        instances_state = self._get_instances_state()
+        try:
+            cached = json.loads(self.vswhere_cache_path.read_text())
+            if (instances_state and cached.get("instances_state") == instances_state
+                    and cached["paths"] and all(os.path.exists(path) for path in cached["paths"])):
+                for path in cached["paths"]:
+                    logger.info(f"Found Visual Studio at: {path} (cached)")
+                return cached["paths"]
+        except (OSError, ValueError, KeyError):
+            pass
+        
         vs_paths = []
+        vswhere_succeeded = False
         
-        try:
-            # Check for Visual Studio 2019/2022
-            registry_paths = [
-                r"SOFTWARE\Microsoft\VisualStudio\SxS\VS7",
-                r"SOFTWARE\WOW6432Node\Microsoft\VisualStudio\SxS\VS7"
+        if os.path.exists(self.vswhere_path):
+            # vswhere performs the full registry/instance discovery in a single process
+            try:
+                result = subprocess.run([
+                    self.vswhere_path,
+                    "-products", "*",
+                    "-requires", "Microsoft.VisualStudio.Component.VC.Tools.x86.x64",
+                    "-format", "json",
+                    "-utf8"
+                ], capture_output=True, check=True)
+                
+                for instance in json.loads(result.stdout.decode("utf-8")):
+                    vs_paths.append(instance["installationPath"])
+                    logger.info(f"Found Visual Studio at: {instance['installationPath']}")
+                vswhere_succeeded = True
+            except (subprocess.CalledProcessError, ValueError, KeyError) as e:
+                logger.warning(f"vswhere check failed: {e}")
+        else:
+            # Installers predating vswhere: fall back to the default Build Tools locations
+            build_tools_paths = [
+                r"C:\Program Files (x86)\Microsoft Visual Studio\2022\BuildTools",
+                r"C:\Program Files (x86)\Microsoft Visual Studio\2019\BuildTools",
+                r"C:\Program Files\Microsoft Visual Studio\2022\BuildTools",
+                r"C:\Program Files\Microsoft Visual Studio\2019\BuildTools",
             ]
             
-            for reg_path in registry_paths:
-                try:
-                    with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path) as key:
-                        i = 0
-                        while True:
-                            try:
-                                name, value, _ = winreg.EnumValue(key, i)
-                                if name.startswith("17.") or name.startswith("16."):  # VS 2022/2019
-                                    vs_paths.append(value)
-                                    logger.info(f"Found Visual Studio at: {value}")
-                                i += 1
-                            except WindowsError:
-                                break
-                except WindowsError:
-                    continue
-                    
-        except Exception as e:
-            logger.warning(f"Registry check failed: {e}")
+            for path in build_tools_paths:
+                if os.path.exists(path):
+                    vs_paths.append(path)
+                    logger.info(f"Found Build Tools at: {path}")
         
-        # Check for Build Tools specifically
-        build_tools_paths = [
-            r"C:\Program Files (x86)\Microsoft Visual Studio\2022\BuildTools",
-            r"C:\Program Files (x86)\Microsoft Visual Studio\2019\BuildTools",
-            r"C:\Program Files\Microsoft Visual Studio\2022\BuildTools",
-            r"C:\Program Files\Microsoft Visual Studio\2019\BuildTools",
-        ]
-        
-        for path in build_tools_paths:
-            if os.path.exists(path):
-                vs_paths.append(path)
-                logger.info(f"Found Build Tools at: {path}")
+        # Only a complete, non-empty vswhere discovery is worth pinning; anything else is retried next run
+        if vswhere_succeeded and vs_paths and instances_state:
+            try:
+                self.vswhere_cache_path.parent.mkdir(parents=True, exist_ok=True)
+                self.vswhere_cache_path.write_text(json.dumps({
+                    "instances_state": instances_state,
+                    "paths": vs_paths
+                }))
+            except OSError as e:
+                logger.warning(f"Could not cache Visual Studio discovery: {e}")
         
         return vs_paths
     
+    def _get_instances_state(self):
+        """Modification time of each installed instance's state.json, keyed by instance id"""
+        instances_state = {}
+        try:
+            with os.scandir(self.vs_instances_path) as instances:
+                for instance in instances:
+                    try:
+                        instances_state[instance.name] = os.stat(
+                            os.path.join(instance.path, "state.json")
+                        ).st_mtime
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return instances_state
+    
     def check_compiler_availability(self):
         """Check if cl.exe is available in PATH"""
         try:
@@ -169,10 +212,55 @@ python -m pip install --upgrade pip setuptools wheel
         logger.info("After installation, restart your command prompt and run this script again.")
         logger.info("=" * 60)
     
+    def write_windows_requirements(self):
+        """Write requirements-windows.txt: requirements.txt minus packages that only build from source"""
+        requirements_path = Path(__file__).parent / "requirements.txt"
+        
+        try:
+            requirements = [
+                line.strip() for line in requirements_path.read_text().splitlines()
+                if line.strip() and not line.lstrip().startswith("#")
+            ]
+            # Prophet 1.1.5 runs on cmdstanpy; pystan (and Cython for it) has no Windows wheels
+            skipped = [line for line in requirements
+                       if re.split(r"[\[<>=!~;\s]", line, 1)[0].lower() in self.SOURCE_ONLY_PACKAGES]
+            if skipped:
+                logger.info(f"Skipping packages not needed on Windows: {skipped}")
+            
+            Path("requirements-windows.txt").write_text(
+                "\n".join(line for line in requirements if line not in skipped) + "\n"
+            )
+            return True
+        except OSError as e:
+            logger.error(f"Could not write requirements-windows.txt: {e}")
+            return False
+    
+    def install_prebuilt_wheels(self):
+        """Install all packages from prebuilt wheels in one resolver run, without a compiler"""
+        logger.info("Installing Python packages from prebuilt wheels...")
+        
+        if not self.write_windows_requirements():
+            return False
+        
+        try:
+            subprocess.run([
+                sys.executable, "-m", "pip", "install",
+                "--prefer-binary", "--only-binary=:all:",
+                "-r", "requirements-windows.txt"
+            ], check=True)
+            logger.info("✅ Python packages installed from prebuilt wheels")
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Prebuilt wheels not available for every package: {e}")
+            return False
+    
     def install_python_packages_with_msvc(self):
         """Install Python packages with MSVC environment"""
         logger.info("Installing Python packages with MSVC environment...")
         
+        if not self.write_windows_requirements():
+            return False
+        
         # Create installation script that uses MSVC environment
         install_script = '''
 @echo off
@@ -205,12 +293,12 @@ echo MSVC environment configured
 echo Installing Python packages...
 
 python -m pip install --upgrade pip setuptools wheel
-python -m pip install numpy pandas scipy matplotlib
-python -m pip install scikit-learn
-python -m pip install statsmodels
-python -m pip install fastapi uvicorn pydantic python-dateutil
-python -m pip install pmdarima
-python -m pip install prophet
+python -m pip install --prefer-binary --only-binary=:all: -r requirements-windows.txt
+if errorlevel 1 (
+    echo Prebuilt wheels unavailable, building from source...
+    python -m pip install --prefer-binary -r requirements-windows.txt
+    if errorlevel 1 exit /b 1
+)
 
 echo Installation completed!
 '''
@@ -230,6 +318,10 @@ echo Installation completed!
         """Run complete setup process"""
         logger.info("🚀 Starting Windows setup for forecasting service...")
         
+        # No compiler is needed when every package resolves to a wheel
+        if self.install_prebuilt_wheels():
+            return True
+        
         # Check current state
         vs_installations = self.check_visual_studio_installation()
         compiler_available = self.check_compiler_availability()
@@ -8,10 +8,18 @@ import os
 import sys
 import signal
 import logging
+import importlib.util
 import asyncio
 import uvicorn
 from contextlib import asynccontextmanager
 
+try:
+    import uvloop
+    uvloop.install()
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -26,6 +34,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+METRICS_SNAPSHOT_PATH = 'final_metrics.json'
+
+def _log_snapshot_failure(future):
+    """Done callback surfacing snapshot write errors that would otherwise die with the Future"""
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Metrics snapshot to {METRICS_SNAPSHOT_PATH} failed: {error}")
+
 class ForecastingServiceManager:
     """Manages the forecasting service lifecycle"""
     
@@ -47,29 +63,27 @@ class ForecastingServiceManager:
         logger.info("Validating environment...")
         
         # Check Python version
-        if sys.version_info < (3, 8):
-            logger.error("Python 3.8 or higher is required")
+        if sys.version_info < (3, 11):
+            logger.error("Python 3.11 or higher is required")
             return False
         
-        # Check critical imports
+        # Check critical modules are installed; find_spec reads metadata without importing them
         critical_modules = ['fastapi', 'uvicorn', 'pydantic', 'pandas', 'numpy']
         for module in critical_modules:
-            try:
-                __import__(module)
+            if importlib.util.find_spec(module) is not None:
                 logger.info(f"✓ {module}")
-            except ImportError as e:
-                logger.error(f"✗ Failed to import {module}: {e}")
+            else:
+                logger.error(f"✗ Module {module} is not installed")
                 return False
         
         # Check optional advanced modules
         advanced_modules = ['sklearn', 'statsmodels', 'prophet', 'pmdarima']
         available_advanced = []
         for module in advanced_modules:
-            try:
-                __import__(module)
+            if importlib.util.find_spec(module) is not None:
                 available_advanced.append(module)
                 logger.info(f"✓ {module} (advanced)")
-            except ImportError:
+            else:
                 logger.warning(f"⚠ {module} not available")
         
         logger.info(f"Advanced features available: {available_advanced}")
@@ -135,13 +149,16 @@ class ForecastingServiceManager:
             from services.monitoring import performance_monitor
             logger.info("Saving performance metrics...")
             
-            # Export final metrics
-            metrics_data = performance_monitor.export_metrics()
-            with open('final_metrics.json', 'w') as f:
-                f.write(metrics_data)
+            # Export final metrics once everything queued has been applied; the wait runs
+            # off the event loop so shutdown stays responsive
+            await asyncio.to_thread(performance_monitor.flush, 5)
+            snapshot = performance_monitor.snapshot(METRICS_SNAPSHOT_PATH)
+            await asyncio.wait_for(asyncio.wrap_future(snapshot), timeout=2)
             
             logger.info("✅ Shutdown sequence completed")
             
+        except asyncio.TimeoutError:
+            logger.warning("Final metrics snapshot did not finish within 2s")
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
     
@@ -154,12 +171,39 @@ class ForecastingServiceManager:
             "workers": int(os.getenv("WORKERS", 1)),
             "reload": os.getenv("RELOAD", "false").lower() == "true",
             "access_log": True,
-            "loop": "asyncio",
+            "loop": "uvloop" if UVLOOP_AVAILABLE else "asyncio",
+            "snapshot_interval": int(os.getenv("METRICS_SNAPSHOT_INTERVAL", 300)),
         }
         
         logger.info(f"Server configuration: {config}")
         return config
     
+    async def _watch_shutdown(self, server):
+        """Stop the server on a shutdown signal, or return once it is exiting on its own"""
+        while not server.should_exit:
+            try:
+                await asyncio.wait_for(self.shutdown_event.wait(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            
+            # Graceful shutdown
+            logger.info("Stopping server...")
+            server.should_exit = True
+        
+        # Also releases the other shutdown waiters when uvicorn stopped on its own
+        self.shutdown_event.set()
+    
+    async def _periodic_snapshot(self, interval_s):
+        """Snapshot metrics every interval_s until shutdown, bounding what a crash can lose"""
+        from services.monitoring import performance_monitor
+        
+        while True:
+            try:
+                await asyncio.wait_for(self.shutdown_event.wait(), timeout=interval_s)
+                return
+            except asyncio.TimeoutError:
+                performance_monitor.snapshot(METRICS_SNAPSHOT_PATH).add_done_callback(_log_snapshot_failure)
+    
     async def run_server(self):
         """Run the server with proper lifecycle management"""
         
@@ -194,21 +238,14 @@ class ForecastingServiceManager:
         
         server = uvicorn.Server(server_config)
         
-        # Start server in background
-        server_task = asyncio.create_task(server.serve())
-        
         logger.info(f"🌟 Forecasting Service started on http://{config['host']}:{config['port']}")
         logger.info("Service is ready to accept requests!")
         
-        # Wait for shutdown signal
-        await self.shutdown_event.wait()
-        
-        # Graceful shutdown
-        logger.info("Stopping server...")
-        server.should_exit = True
-        
-        # Wait for server to stop
-        await server_task
+        # Serve until the watcher stops the server; the group exits once both tasks finish
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(server.serve())
+            tg.create_task(self._watch_shutdown(server))
+            tg.create_task(self._periodic_snapshot(config["snapshot_interval"]))
         
         # Run shutdown sequence
         await self.shutdown_sequence()
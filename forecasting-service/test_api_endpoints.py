@@ -5,17 +5,64 @@ Tests all endpoints with real requests and validates responses
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+import pandas as pd
 import json
-import time
-from datetime import datetime, timedelta
+import orjson
+import ijson
+from datetime import date, datetime, timedelta
 import sys
 import threading
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
 import subprocess
 import os
+import hashlib
+import inspect
+from functools import partial
 
 # Test configuration
 BASE_URL = "http://localhost:8000"
 TEST_TIMEOUT = 30
+BATCH_N = int(os.environ.get("BATCH_N", "32"))
+
+# Shared keep-alive session so every endpoint call reuses pooled connections; refused
+# connects are retried inside urllib3 with backoff (capped at 1s) while the server boots
+SERVER_RETRY = Retry(total=20, connect=20, backoff_factor=0.05, backoff_max=1.0, status_forcelist=[])
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=SERVER_RETRY))
+SESSION.headers["Connection"] = "keep-alive"
+
+# Request bodies are encoded once with orjson and posted as raw bytes
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Success-path detail is printed only when VERBOSE is set; pytest reports pass/fail itself
+VERBOSE = bool(os.environ.get("VERBOSE"))
+
+def vprint(*args, **kwargs):
+    if VERBOSE:
+        print(*args, **kwargs)
+
+# Every test is a coroutine sharing the session event loop and its pooled client; under
+# pytest-xdist the group keeps them all on the one worker that talks to the server
+pytestmark = [pytest.mark.asyncio(loop_scope="session"), pytest.mark.xdist_group("server")]
+
+def make_client():
+    """Async client with a keep-alive pool shared by all endpoint tests"""
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=TEST_TIMEOUT
+    )
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client():
+    async with make_client() as c:
+        yield c
 
 def start_server():
     """Start the forecasting service in background"""
@@ -26,242 +73,260 @@ def start_server():
         sys.executable, "main.py"
     ], cwd=os.path.dirname(os.path.abspath(__file__)))
     
-    # Wait for server to start
-    for i in range(10):
-        try:
-            response = requests.get(f"{BASE_URL}/health", timeout=2)
-            if response.status_code == 200:
-                print("✅ Server started successfully")
-                return process
-        except:
-            time.sleep(1)
+    # A single probe: the adapter's Retry backs off until the first connect succeeds
+    try:
+        response = SESSION.get(f"{BASE_URL}/health", timeout=(0.2, 2.0))
+        if response.ok:
+            print("✅ Server started successfully")
+            return process
+    except requests.RequestException:
+        pass
     
     print("❌ Failed to start server")
+    process.terminate()
+    process.wait()
     return None
 
-def test_health_endpoint():
-    """Test health check endpoint"""
-    print("\n📋 Testing /health endpoint...")
-    
+def server_is_up():
+    """Single probe of /health that fails fast instead of going through SESSION's retries"""
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=5)
-        
-        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
-        
-        data = response.json()
-        assert "status" in data, "Response missing 'status' field"
-        assert data["status"] == "healthy", f"Expected 'healthy', got {data['status']}"
-        assert "timestamp" in data, "Response missing 'timestamp' field"
-        
-        print("✅ Health endpoint working correctly")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Health endpoint failed: {e}")
+        return requests.get(f"{BASE_URL}/health", timeout=1).ok
+    except requests.RequestException:
         return False
 
-def test_forecast_endpoint():
-    """Test single item forecast endpoint"""
-    print("\n📊 Testing /forecast endpoint...")
+@pytest.fixture(scope="session", autouse=True)
+def server():
+    """Use the service already on BASE_URL, else start one; skip the module if neither works"""
+    if server_is_up():
+        yield None
+        return
     
-    # Create test data
-    sales_data = []
-    base_date = datetime.now() - timedelta(days=20)
+    process = start_server()
+    if process is None:
+        pytest.skip(f"Forecasting service is not reachable at {BASE_URL}")
     
-    for i in range(15):
-        date_str = (base_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        # Create realistic sales pattern
-        base_sales = 8 + (i % 7) * 2  # Weekly pattern
-        sales_data.append({
-            "date": date_str,
-            "quantity_sold": base_sales
-        })
+    yield process
     
-    forecast_request = {
+    process.terminate()
+    process.wait()
+
+async def test_health_endpoint(client):
+    """Test health check endpoint"""
+    vprint("\n📋 Testing /health endpoint...")
+    
+    response = await client.get("/health", timeout=5)
+    
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+    
+    data = orjson.loads(response.content)
+    assert "status" in data, "Response missing 'status' field"
+    assert data["status"] == "healthy", f"Expected 'healthy', got {data['status']}"
+    assert "timestamp" in data, "Response missing 'timestamp' field"
+    
+    vprint("✅ Health endpoint working correctly")
+
+def make_item(i):
+    """Forecast request for test item i; items differ in sales level, stock and lead time"""
+    dates = pd.date_range(start=datetime.now() - timedelta(days=20), periods=15, freq="D").strftime("%Y-%m-%d").to_numpy()
+    # Create realistic sales pattern
+    quantities = 8 + i * 3 + (np.arange(15) % 7) * 2  # Weekly pattern
+    sales_data = [{"date": d, "quantity_sold": int(q)} for d, q in zip(dates, quantities)]
+    
+    return {
         "user_id": "test-user-001",
-        "sku": "TEST-PRODUCT-001",
+        "sku": f"TEST-PRODUCT-{i+1:03d}",
         "sales_history": sales_data,
-        "current_stock": 100,
-        "lead_time_days": 7,
+        "current_stock": 100 + i * 25,
+        "lead_time_days": 7 + i % 7,
         "forecast_days": 7
     }
+
+def build_batch_request():
+    """Batch request covering BATCH_N test items"""
+    return {
+        "user_id": "test-user-001",
+        "items": [make_item(i) for i in range(BATCH_N)]
+    }
+
+def body_cache_key() -> str:
+    """Digest of everything a cached body depends on: the builders' code, BATCH_N and today's date"""
+    digest = hashlib.sha256()
+    for part in (inspect.getsource(make_item), inspect.getsource(build_batch_request),
+                 str(BATCH_N), date.today().isoformat()):
+        digest.update(part.encode())
+    return digest.hexdigest()[:16]
+
+def cached_body(pytestconfig, name: str, build) -> bytes:
+    """Serialized request body, rebuilt whenever its cache key changes; stale versions are removed"""
+    cache = getattr(pytestconfig, "cache", None)
+    if cache is None:
+        # Cache plugin disabled (-p no:cacheprovider): build in memory
+        return orjson.dumps(build())
     
-    try:
-        response = requests.post(
-            f"{BASE_URL}/forecast", 
-            json=forecast_request,
-            timeout=TEST_TIMEOUT
-        )
-        
-        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
-        
-        data = response.json()
+    cache_dir = cache.mkdir("request-bodies")
+    path = cache_dir / f"{name}-{body_cache_key()}.json"
+    if not path.exists():
+        for stale in cache_dir.glob(f"{name}*.json"):
+            stale.unlink()
+        path.write_bytes(orjson.dumps(build()))
+    return path.read_bytes()
+
+@pytest.fixture(scope="session")
+def forecast_body(pytestconfig):
+    return cached_body(pytestconfig, "single", partial(make_item, 0))
+
+@pytest.fixture(scope="session")
+def batch_body(pytestconfig):
+    return cached_body(pytestconfig, "batch", build_batch_request)
+
+async def test_forecast_endpoint(client, forecast_body):
+    """Test single item forecast endpoint"""
+    vprint("\n📊 Testing /forecast endpoint...")
+    
+    response = await client.post(
+        "/forecast",
+        content=forecast_body,
+        headers=JSON_HEADERS,
+        timeout=TEST_TIMEOUT
+    )
+    
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+    
+    data = orjson.loads(response.content)
+    if VERBOSE:
         print(f"Response: {json.dumps(data, indent=2)}")
-        
-        # Validate response structure
-        assert "success" in data, "Response missing 'success' field"
-        assert data["success"] == True, f"Forecast failed: {data.get('error_message', 'Unknown error')}"
-        
-        assert "forecast" in data, "Response missing 'forecast' field"
-        forecast = data["forecast"]
-        
-        # Validate forecast structure
-        required_fields = [
-            "sku", "current_stock", "forecast_7_day", "recommended_order",
-            "confidence_score", "trend", "seasonality_detected", 
-            "lead_time_factored", "model_used", "data_quality_score"
-        ]
-        
-        for field in required_fields:
-            assert field in forecast, f"Forecast missing required field: {field}"
-        
-        # Validate field values
-        assert forecast["sku"] == "TEST-PRODUCT-001", "SKU mismatch"
-        assert forecast["current_stock"] == 100, "Current stock mismatch"
-        assert forecast["forecast_7_day"] >= 0, "Forecast should be non-negative"
-        assert forecast["recommended_order"] >= 0, "Recommended order should be non-negative"
-        assert 0 <= forecast["confidence_score"] <= 1, "Confidence score should be between 0 and 1"
-        assert forecast["trend"] in ["increasing", "decreasing", "stable"], "Invalid trend value"
-        assert forecast["lead_time_factored"] == 7, "Lead time mismatch"
-        assert 0 <= forecast["data_quality_score"] <= 1, "Data quality score should be between 0 and 1"
-        
-        print("✅ Forecast endpoint working correctly")
-        print(f"   Model used: {forecast['model_used']}")
-        print(f"   7-day forecast: {forecast['forecast_7_day']}")
-        print(f"   Recommended order: {forecast['recommended_order']}")
-        print(f"   Confidence: {forecast['confidence_score']:.3f}")
-        print(f"   Trend: {forecast['trend']}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Forecast endpoint failed: {e}")
-        return False
+    
+    # Validate response structure
+    assert "success" in data, "Response missing 'success' field"
+    assert data["success"] == True, f"Forecast failed: {data.get('error_message', 'Unknown error')}"
+    
+    assert "forecast" in data, "Response missing 'forecast' field"
+    forecast = data["forecast"]
+    
+    # Validate forecast structure
+    required_fields = [
+        "sku", "current_stock", "forecast_7_day", "recommended_order",
+        "confidence_score", "trend", "seasonality_detected", 
+        "lead_time_factored", "model_used", "data_quality_score"
+    ]
+    
+    for field in required_fields:
+        assert field in forecast, f"Forecast missing required field: {field}"
+    
+    # Validate field values
+    assert forecast["sku"] == "TEST-PRODUCT-001", "SKU mismatch"
+    assert forecast["current_stock"] == 100, "Current stock mismatch"
+    assert forecast["forecast_7_day"] >= 0, "Forecast should be non-negative"
+    assert forecast["recommended_order"] >= 0, "Recommended order should be non-negative"
+    assert 0 <= forecast["confidence_score"] <= 1, "Confidence score should be between 0 and 1"
+    assert forecast["trend"] in ["increasing", "decreasing", "stable"], "Invalid trend value"
+    assert forecast["lead_time_factored"] == 7, "Lead time mismatch"
+    assert 0 <= forecast["data_quality_score"] <= 1, "Data quality score should be between 0 and 1"
+    
+    vprint("✅ Forecast endpoint working correctly")
+    vprint(f"   Model used: {forecast['model_used']}")
+    vprint(f"   7-day forecast: {forecast['forecast_7_day']}")
+    vprint(f"   Recommended order: {forecast['recommended_order']}")
+    vprint(f"   Confidence: {forecast['confidence_score']:.3f}")
+    vprint(f"   Trend: {forecast['trend']}")
 
-def test_batch_forecast_endpoint():
-    """Test batch forecast endpoint"""
-    print("\n📊 Testing /forecast/batch endpoint...")
+BATCH_ARRAYS = ("forecasts", "insufficient_data_items", "failed_items")
+# Events that open a new array element: a container start or a scalar value
+ITEM_START_EVENTS = frozenset(("start_map", "start_array", "string", "number", "boolean", "null"))
+
+async def stream_batch_arrays(response, on_forecast):
+    """Parse the batch response arrays as chunks arrive, returning the item count of each"""
+    # A single tokenizer pass; only the forecast currently being read is ever materialized
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events)
+    item_prefixes = {f"{name}.item": name for name in BATCH_ARRAYS}
+    counts = dict.fromkeys(BATCH_ARRAYS, 0)
+    builder = None
     
-    # Create test data for multiple items
-    items = []
-    for i in range(3):
-        sales_data = []
-        base_date = datetime.now() - timedelta(days=20)
-        
-        for j in range(15):
-            date_str = (base_date + timedelta(days=j)).strftime("%Y-%m-%d")
-            base_sales = 5 + i * 3 + (j % 7)  # Different patterns per item
-            sales_data.append({
-                "date": date_str,
-                "quantity_sold": base_sales
-            })
-        
-        items.append({
-            "user_id": "test-user-001",
-            "sku": f"TEST-PRODUCT-{i+1:03d}",
-            "sales_history": sales_data,
-            "current_stock": 50 + i * 25,
-            "lead_time_days": 5 + i,
-            "forecast_days": 7
-        })
-    
-    batch_request = {
-        "user_id": "test-user-001",
-        "items": items
-    }
+    def consume():
+        nonlocal builder
+        for prefix, event, value in events:
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == "forecasts.item" and event == "end_map":
+                    on_forecast(builder.value)
+                    builder = None
+            elif prefix in item_prefixes and event in ITEM_START_EVENTS:
+                counts[item_prefixes[prefix]] += 1
+                if prefix == "forecasts.item" and event == "start_map":
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+        del events[:]
     
-    try:
-        response = requests.post(
-            f"{BASE_URL}/forecast/batch", 
-            json=batch_request,
-            timeout=TEST_TIMEOUT * 2  # Longer timeout for batch
-        )
-        
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        consume()
+    
+    parser.close()
+    consume()
+    return counts
+
+def check_forecast(forecast):
+    assert "sku" in forecast, "Forecast missing SKU"
+    assert "forecast_7_day" in forecast, "Forecast missing 7-day prediction"
+    assert forecast["forecast_7_day"] >= 0, "Forecast should be non-negative"
+
+async def test_batch_forecast_endpoint(client, batch_body):
+    """Test batch forecast endpoint"""
+    vprint("\n📊 Testing /forecast/batch endpoint...")
+    
+    async with client.stream(
+        "POST",
+        "/forecast/batch",
+        content=batch_body,
+        headers=JSON_HEADERS,
+        timeout=TEST_TIMEOUT + BATCH_N * 2  # Batch items are forecast one after another
+    ) as response:
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         
-        data = response.json()
-        print(f"Batch response summary: {len(data.get('forecasts', []))} forecasts generated")
-        
-        # Validate response structure
-        assert "forecasts" in data, "Response missing 'forecasts' field"
-        assert "insufficient_data_items" in data, "Response missing 'insufficient_data_items' field"
-        assert "failed_items" in data, "Response missing 'failed_items' field"
-        
-        forecasts = data["forecasts"]
-        assert len(forecasts) > 0, "No forecasts generated"
-        
-        # Validate each forecast
-        for forecast in forecasts:
-            assert "sku" in forecast, "Forecast missing SKU"
-            assert "forecast_7_day" in forecast, "Forecast missing 7-day prediction"
-            assert forecast["forecast_7_day"] >= 0, "Forecast should be non-negative"
-        
-        print("✅ Batch forecast endpoint working correctly")
-        print(f"   Generated {len(forecasts)} forecasts")
-        print(f"   Insufficient data items: {len(data.get('insufficient_data_items', []))}")
-        print(f"   Failed items: {len(data.get('failed_items', []))}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Batch forecast endpoint failed: {e}")
-        return False
+        # Each forecast is validated as it is parsed off the wire
+        counts = await stream_batch_arrays(response, check_forecast)
+    
+    vprint(f"Batch response summary: {counts['forecasts']} forecasts generated")
+    
+    assert counts["forecasts"] > 0, "No forecasts generated"
+    
+    reported = sum(counts.values())
+    assert reported == BATCH_N, f"Expected {BATCH_N} items accounted for, got {reported}"
+    
+    vprint("✅ Batch forecast endpoint working correctly")
+    vprint(f"   Generated {counts['forecasts']} forecasts")
+    vprint(f"   Insufficient data items: {counts['insufficient_data_items']}")
+    vprint(f"   Failed items: {counts['failed_items']}")
 
-def test_metrics_endpoints():
+async def test_metrics_endpoints(client):
     """Test metrics endpoints"""
-    print("\n📈 Testing metrics endpoints...")
+    vprint("\n📈 Testing metrics endpoints...")
     
-    try:
-        # Test performance metrics
-        response = requests.get(f"{BASE_URL}/metrics/performance", timeout=5)
-        assert response.status_code == 200, f"Performance metrics failed: {response.status_code}"
-        
-        data = response.json()
-        assert "status" in data, "Performance metrics missing status"
-        assert "data" in data, "Performance metrics missing data"
-        
-        print("✅ Performance metrics endpoint working")
-        
-        # Test model metrics
-        response = requests.get(f"{BASE_URL}/metrics/models", timeout=5)
-        assert response.status_code == 200, f"Model metrics failed: {response.status_code}"
-        
-        data = response.json()
-        assert "status" in data, "Model metrics missing status"
-        assert "data" in data, "Model metrics missing data"
-        
-        print("✅ Model metrics endpoint working")
-        
-        # Test configuration endpoint
-        response = requests.get(f"{BASE_URL}/config", timeout=5)
-        assert response.status_code == 200, f"Config endpoint failed: {response.status_code}"
-        
-        data = response.json()
-        assert "status" in data, "Config missing status"
-        assert "configuration" in data, "Config missing configuration"
-        
-        print("✅ Configuration endpoint working")
+    # The three GETs are independent, so issue them together on the pooled client
+    checks = [
+        ("Performance metrics", "/metrics/performance", ("status", "data")),
+        ("Model metrics", "/metrics/models", ("status", "data")),
+        ("Config", "/config", ("status", "configuration")),
+    ]
+    responses = await asyncio.gather(*(client.get(path, timeout=5) for _, path, _ in checks))
+    
+    for (name, _, fields), response in zip(checks, responses):
+        assert response.status_code == 200, f"{name} failed: {response.status_code}"
         
-        return True
+        data = orjson.loads(response.content)
+        for field in fields:
+            assert field in data, f"{name} missing {field}"
         
-    except Exception as e:
-        print(f"❌ Metrics endpoints failed: {e}")
-        return False
+        vprint(f"✅ {name} endpoint working")
 
-def test_insufficient_data_handling():
+async def test_insufficient_data_handling(client):
     """Test insufficient data notification system"""
-    print("\n⚠️  Testing insufficient data handling...")
+    vprint("\n⚠️  Testing insufficient data handling...")
     
     # Create insufficient data (less than 14 points)
-    sales_data = []
-    base_date = datetime.now() - timedelta(days=5)
-    
-    for i in range(5):  # Only 5 data points
-        date_str = (base_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        sales_data.append({
-            "date": date_str,
-            "quantity_sold": 5
-        })
+    dates = pd.date_range(start=datetime.now() - timedelta(days=5), periods=5, freq="D").strftime("%Y-%m-%d").to_numpy()
+    sales_data = [{"date": d, "quantity_sold": 5} for d in dates]  # Only 5 data points
     
     forecast_request = {
         "user_id": "test-user-001",
@@ -271,33 +336,54 @@ def test_insufficient_data_handling():
         "lead_time_days": 7
     }
     
-    try:
-        response = requests.post(
-            f"{BASE_URL}/forecast", 
-            json=forecast_request,
-            timeout=TEST_TIMEOUT
-        )
-        
-        assert response.status_code == 200, f"Expected 200, got {response.status_code}"
-        
-        data = response.json()
-        
-        # Should fail due to insufficient data
-        assert "success" in data, "Response missing 'success' field"
-        assert data["success"] == False, "Should fail with insufficient data"
-        assert "insufficient_data" in data, "Response missing 'insufficient_data' field"
-        assert data["insufficient_data"] == True, "Should indicate insufficient data"
-        assert "minimum_data_points_required" in data, "Missing minimum data points info"
-        assert data["minimum_data_points_required"] == 14, "Should require 14 data points"
-        
-        print("✅ Insufficient data handling working correctly")
-        print(f"   Error message: {data.get('error_message', 'N/A')}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ Insufficient data handling failed: {e}")
-        return False
+    response = await client.post(
+        "/forecast",
+        content=orjson.dumps(forecast_request),
+        headers=JSON_HEADERS,
+        timeout=TEST_TIMEOUT
+    )
+    
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}"
+    
+    data = orjson.loads(response.content)
+    
+    # Should fail due to insufficient data
+    assert "success" in data, "Response missing 'success' field"
+    assert data["success"] == False, "Should fail with insufficient data"
+    assert "insufficient_data" in data, "Response missing 'insufficient_data' field"
+    assert data["insufficient_data"] == True, "Should indicate insufficient data"
+    assert "minimum_data_points_required" in data, "Missing minimum data points info"
+    assert data["minimum_data_points_required"] == 14, "Should require 14 data points"
+    
+    vprint("✅ Insufficient data handling working correctly")
+    vprint(f"   Error message: {data.get('error_message', 'N/A')}")
+
+async def run_all(stages):
+    """Run each stage's tests concurrently on one pooled client; returns (passed, failed)"""
+    passed = 0
+    failed = 0
+    
+    async with make_client() as client:
+        for stage in stages:
+            print(f"\n{'='*60}")
+            print(f"Running: {', '.join(test_name for test_name, _ in stage)}")
+            print(f"{'='*60}")
+            
+            results = await asyncio.gather(
+                *(test_func(client) for _, test_func in stage),
+                return_exceptions=True
+            )
+            
+            # Tests signal failure by raising, exactly as they do under pytest
+            for (test_name, _), result in zip(stage, results):
+                if isinstance(result, Exception):
+                    failed += 1
+                    print(f"❌ {test_name} FAILED: {type(result).__name__}: {result}")
+                else:
+                    passed += 1
+                    print(f"✅ {test_name} PASSED")
+    
+    return passed, failed
 
 def main():
     """Run all API endpoint tests"""
@@ -311,36 +397,23 @@ def main():
         return False
     
     try:
-        # Wait a bit more for server to fully initialize
-        time.sleep(3)
-        
         # Run all tests
-        tests = [
-            ("Health Check", test_health_endpoint),
-            ("Single Forecast", test_forecast_endpoint),
-            ("Batch Forecast", test_batch_forecast_endpoint),
-            ("Metrics Endpoints", test_metrics_endpoints),
-            ("Insufficient Data Handling", test_insufficient_data_handling),
+        # Tests within a stage run concurrently. The batch forecast keeps the server busy
+        # for BATCH_N model fits, which would time out concurrent requests, so it runs alone
+        stages = [
+            [
+                ("Health Check", test_health_endpoint),
+                ("Single Forecast", partial(test_forecast_endpoint, forecast_body=orjson.dumps(make_item(0)))),
+                ("Metrics Endpoints", test_metrics_endpoints),
+                ("Insufficient Data Handling", test_insufficient_data_handling),
+            ],
+            [
+                ("Batch Forecast", partial(test_batch_forecast_endpoint, batch_body=orjson.dumps(build_batch_request()))),
+            ],
         ]
+        tests = [test for stage in stages for test in stage]
         
-        passed = 0
-        failed = 0
-        
-        for test_name, test_func in tests:
-            print(f"\n{'='*60}")
-            print(f"Running: {test_name}")
-            print(f"{'='*60}")
-            
-            try:
-                if test_func():
-                    passed += 1
-                    print(f"✅ {test_name} PASSED")
-                else:
-                    failed += 1
-                    print(f"❌ {test_name} FAILED")
-            except Exception as e:
-                failed += 1
-                print(f"❌ {test_name} FAILED with exception: {e}")
+        passed, failed = asyncio.run(run_all(stages))
         
         # Summary
         print(f"\n{'='*60}")
@@ -370,6 +443,7 @@ def main():
             server_process.terminate()
             server_process.wait()
             print("✅ Server stopped")
+        SESSION.close()
 
 if __name__ == "__main__":
     success = main()
@@ -2,17 +2,85 @@ import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import os
 import json
-import asyncio
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from models.api_models import SalesDataPoint, ForecastRequest
 from services.data_validator import DataValidator
 from services.forecast_processor import ForecastProcessor
+from services.monitoring import ForecastMetrics, PerformanceMonitor
+from services.monitoring_kernels import _model_stats_numpy, model_stats
 from models.forecasting_models import ARIMAForecaster, ProphetForecaster
 
-def test_data_validator():
+# Success-path detail is printed only when VERBOSE is set; pytest reports pass/fail itself
+VERBOSE = bool(os.environ.get("VERBOSE"))
+
+def vprint(*args, **kwargs):
+    if VERBOSE:
+        print(*args, **kwargs)
+
+def _date_strs(days_ago: int, periods: int) -> np.ndarray:
+    """YYYY-MM-DD strings for consecutive days starting days_ago days back, formatted in one pass"""
+    start = datetime.now() - timedelta(days=days_ago)
+    return pd.date_range(start=start, periods=periods, freq='D').strftime("%Y-%m-%d").to_numpy()
+
+@lru_cache(maxsize=32)
+def _sales_df(periods: int, pattern: str, seed: int = 0) -> pd.DataFrame:
+    """Synthetic daily sales starting 2024-01-01, memoized on (periods, pattern, seed)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start='2024-01-01', periods=periods, freq='D')
+    days = np.arange(periods)
+    
+    if pattern == "uniform":
+        quantities = rng.integers(1, 10, periods)
+    elif pattern == "trending":
+        quantities = np.maximum(0, np.linspace(5, 15, periods) + rng.normal(0, 1, periods)).astype(int)
+    elif pattern == "seasonal":
+        # Upward trend with weekly seasonality
+        seasonal = 8 + days * 0.2 + 3 * np.sin(2 * np.pi * days / 7)
+        quantities = np.maximum(0, seasonal + rng.normal(0, 1, periods)).astype(int)
+    elif pattern == "poisson":
+        quantities = rng.poisson(10, periods)  # Poisson distribution for sales
+    else:
+        raise ValueError(f"Unknown sales pattern: {pattern}")
+    
+    return pd.DataFrame({'date': dates, 'quantity': quantities})
+
+@pytest.fixture(scope="session")
+def make_df():
+    return _sales_df
+
+@pytest.fixture(scope="session")
+def big_df(make_df):
+    """Year of daily sales, materialized once per session"""
+    return make_df(365, "poisson")
+
+@pytest.fixture
+def rng(request):
+    """Generator seeded from the test's node id, so its data never depends on test scheduling"""
+    return np.random.default_rng(zlib.crc32(request.node.nodeid.encode()))
+
+@pytest.fixture(scope="session")
+def validator():
+    return DataValidator()
+
+@pytest.fixture(scope="session")
+def arima_forecaster():
+    return ARIMAForecaster()
+
+@pytest.fixture(scope="session")
+def prophet_forecaster():
+    return ProphetForecaster()
+
+@pytest.fixture(scope="session")
+def processor():
+    return ForecastProcessor()
+
+def test_data_validator(validator, rng):
     """Test data validation with minimum requirements"""
-    validator = DataValidator()
-    
     # Test insufficient data
     insufficient_data = [
         SalesDataPoint(date="2024-01-01", quantity_sold=5),
@@ -23,50 +91,40 @@ def test_data_validator():
     assert result.insufficient_data
     
     # Test sufficient data
-    sufficient_data = []
-    base_date = datetime.now() - timedelta(days=20)
-    for i in range(15):
-        date_str = (base_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        sufficient_data.append(SalesDataPoint(date=date_str, quantity_sold=np.random.randint(1, 10)))
+    quantities = rng.integers(1, 10, 15)
+    sufficient_data = [
+        SalesDataPoint(date=date_str, quantity_sold=int(quantity))
+        for date_str, quantity in zip(_date_strs(20, 15), quantities)
+    ]
     
     result = validator.validate_sales_data(sufficient_data)
     assert result.is_valid
     assert not result.insufficient_data
 
-def test_arima_forecaster():
+def test_arima_forecaster(arima_forecaster, make_df):
     """Test ARIMA forecasting model"""
-    forecaster = ARIMAForecaster()
-    
-    # Create test data
-    dates = pd.date_range(start='2024-01-01', periods=20, freq='D')
-    quantities = np.random.randint(1, 10, 20)
-    df = pd.DataFrame({'date': dates, 'quantity': quantities})
+    df = make_df(20, "uniform")
     
-    result = forecaster.fit_and_forecast(df, forecast_days=7)
+    result = arima_forecaster.fit_and_forecast(df, forecast_days=7)
     
     assert len(result.predictions) == 7
     assert result.model_name == "ARIMA-Simple"
     assert result.trend in ["increasing", "decreasing", "stable"]
     assert 0 <= result.confidence_score <= 1
 
-def test_forecast_processor():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_forecast_processor(processor, make_df):
     """Test forecast processor integration"""
-    processor = ForecastProcessor()
-    
-    # Create test data
-    dates = pd.date_range(start='2024-01-01', periods=20, freq='D')
-    quantities = np.random.randint(1, 10, 20)
-    df = pd.DataFrame({'date': dates, 'quantity': quantities})
+    df = make_df(20, "uniform")
     
     # Test forecast generation
-    import asyncio
-    result = asyncio.run(processor.generate_forecast(
+    result = await processor.generate_forecast(
         df=df,
         sku="TEST-SKU-001",
         current_stock=50,
         lead_time_days=7,
         forecast_days=7
-    ))
+    )
     
     assert result.success
     assert result.forecast is not None
@@ -77,11 +135,7 @@ def test_forecast_processor():
 def test_forecast_request_validation():
     """Test API model validation"""
     # Test valid request
-    sales_data = []
-    base_date = datetime.now() - timedelta(days=20)
-    for i in range(15):
-        date_str = (base_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        sales_data.append(SalesDataPoint(date=date_str, quantity_sold=5))
+    sales_data = [SalesDataPoint(date=date_str, quantity_sold=5) for date_str in _date_strs(20, 15)]
     
     request = ForecastRequest(
         user_id="test-user",
@@ -97,66 +151,29 @@ def test_forecast_request_validation():
     assert request.current_stock == 100
     assert request.lead_time_days == 7
 
-if __name__ == "__main__":
-    # Run basic tests
-    print("Running forecasting service tests...")
-    
-    try:
-        test_data_validator()
-        print("✓ Data validator test passed")
-        
-        test_arima_forecaster()
-        print("✓ ARIMA forecaster test passed")
-        
-        test_forecast_processor()
-        print("✓ Forecast processor test passed")
-        
-        test_forecast_request_validation()
-        print("✓ API model validation test passed")
-        
-        print("\nAll tests passed! Forecasting service is working correctly.")
-        
-    except Exception as e:
-        print(f"✗ Test failed: {str(e)}")
-        raise
-de
-f test_advanced_data_validation():
+def test_advanced_data_validation(validator, rng):
     """Test advanced data validation features"""
-    validator = DataValidator()
-    
     # Test with realistic sales data including outliers
-    sales_data = []
-    base_date = datetime.now() - timedelta(days=30)
+    dates = _date_strs(30, 25)
     
     # Generate realistic sales pattern with seasonality and outliers
-    for i in range(25):
-        date_str = (base_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        
-        # Base sales with weekly pattern
-        base_sales = 10 + 5 * np.sin(2 * np.pi * i / 7)  # Weekly seasonality
-        
-        # Add some noise
-        noise = np.random.normal(0, 2)
-        
-        # Add occasional spikes (outliers)
-        if i in [10, 20]:  # Spike days
-            base_sales += 20
-        
-        quantity = max(0, int(base_sales + noise))
-        sales_data.append(SalesDataPoint(date=date_str, quantity_sold=quantity))
+    base_sales = 10 + 5 * np.sin(2 * np.pi * np.arange(25) / 7)  # Weekly seasonality
+    base_sales[[10, 20]] += 20  # Spike days (outliers)
+    noise = rng.normal(0, 2, 25)
+    quantities = np.maximum(0, base_sales + noise).astype(int)
+    
+    sales_data = [SalesDataPoint(date=d, quantity_sold=int(q)) for d, q in zip(dates, quantities)]
     
     result = validator.validate_sales_data(sales_data)
     
     assert result.is_valid
     assert not result.insufficient_data
     assert 0.0 <= result.data_quality_score <= 1.0
-    print(f"Data quality score: {result.data_quality_score}")
-    print(f"Warnings: {result.warnings}")
+    vprint(f"Data quality score: {result.data_quality_score}")
+    vprint(f"Warnings: {result.warnings}")
 
-def test_anomaly_detection():
+def test_anomaly_detection(validator):
     """Test comprehensive anomaly detection"""
-    validator = DataValidator()
-    
     # Create test data with known anomalies
     dates = pd.date_range(start='2024-01-01', periods=20, freq='D')
     quantities = [5, 6, 4, 5, 7, 25, 6, 5, 4, 0, 0, 0, 6, 5, 4, 30, 5, 6, 4, 5]  # Spikes and gaps
@@ -166,213 +183,357 @@ def test_anomaly_detection():
     anomalies = validator.detect_data_anomalies(df)
     
     assert len(anomalies['sudden_spikes']) > 0  # Should detect spikes
-    print(f"Detected anomalies: {json.dumps(anomalies, indent=2, default=str)}")
+    if VERBOSE:
+        print(f"Detected anomalies: {json.dumps(anomalies, indent=2, default=str)}")
 
-def test_prophet_advanced_features():
+def test_prophet_advanced_features(prophet_forecaster, rng):
     """Test Prophet with advanced seasonality features"""
-    forecaster = ProphetForecaster()
-    
     # Create data with clear weekly pattern
     dates = pd.date_range(start='2024-01-01', periods=35, freq='D')
-    quantities = []
     
-    for i, date in enumerate(dates):
-        # Weekly pattern: higher sales on weekends
-        base_sales = 10
-        if date.dayofweek in [5, 6]:  # Weekend
-            base_sales += 5
-        
-        # Add trend
-        base_sales += i * 0.1
-        
-        # Add noise
-        noise = np.random.normal(0, 1)
-        quantities.append(max(0, int(base_sales + noise)))
+    base_sales = 10 + np.where(dates.dayofweek >= 5, 5, 0)  # Weekly pattern: higher sales on weekends
+    base_sales = base_sales + np.arange(35) * 0.1  # Add trend
+    noise = rng.normal(0, 1, 35)
+    quantities = np.maximum(0, base_sales + noise).astype(int)
     
     df = pd.DataFrame({'date': dates, 'quantity': quantities})
     
-    result = forecaster.fit_and_forecast(df, forecast_days=7)
+    result = prophet_forecaster.fit_and_forecast(df, forecast_days=7)
     
     assert len(result.predictions) == 7
     assert result.seasonality_detected
     assert result.trend in ["increasing", "decreasing", "stable"]
     assert 0 <= result.confidence_score <= 1
-    print(f"Prophet model: {result.model_name}")
-    print(f"Trend: {result.trend}, Seasonality: {result.seasonality_detected}")
-    print(f"Confidence: {result.confidence_score:.3f}")
-    print(f"Model params: {result.model_params}")
+    vprint(f"Prophet model: {result.model_name}")
+    vprint(f"Trend: {result.trend}, Seasonality: {result.seasonality_detected}")
+    vprint(f"Confidence: {result.confidence_score:.3f}")
+    vprint(f"Model params: {result.model_params}")
 
-def test_arima_advanced_features():
+def test_arima_advanced_features(arima_forecaster, make_df):
     """Test ARIMA with statsmodels integration"""
-    forecaster = ARIMAForecaster()
-    
-    # Create trending data
-    dates = pd.date_range(start='2024-01-01', periods=30, freq='D')
-    trend = np.linspace(5, 15, 30)
-    noise = np.random.normal(0, 1, 30)
-    quantities = np.maximum(0, trend + noise).astype(int)
-    
-    df = pd.DataFrame({'date': dates, 'quantity': quantities})
+    df = make_df(30, "trending")
     
-    result = forecaster.fit_and_forecast(df, forecast_days=7)
+    result = arima_forecaster.fit_and_forecast(df, forecast_days=7)
     
     assert len(result.predictions) == 7
     assert result.model_name.startswith("ARIMA")
     assert result.trend in ["increasing", "decreasing", "stable"]
-    print(f"ARIMA model: {result.model_name}")
-    print(f"Model params: {result.model_params}")
-    print(f"Residual diagnostics: {result.residual_diagnostics}")
+    vprint(f"ARIMA model: {result.model_name}")
+    vprint(f"Model params: {result.model_params}")
+    vprint(f"Residual diagnostics: {result.residual_diagnostics}")
 
-def test_ensemble_forecasting():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_ensemble_forecasting(processor, make_df):
     """Test ensemble forecasting with model selection"""
-    processor = ForecastProcessor()
-    
-    # Create complex data with trend and seasonality
-    dates = pd.date_range(start='2024-01-01', periods=28, freq='D')
-    quantities = []
-    
-    for i, date in enumerate(dates):
-        # Base trend
-        base = 8 + i * 0.2
-        
-        # Weekly seasonality
-        seasonal = 3 * np.sin(2 * np.pi * i / 7)
-        
-        # Noise
-        noise = np.random.normal(0, 1)
-        
-        quantities.append(max(0, int(base + seasonal + noise)))
-    
-    df = pd.DataFrame({'date': dates, 'quantity': quantities})
+    # Complex data with trend and seasonality
+    df = make_df(28, "seasonal")
     
     # Test forecast generation
-    result = asyncio.run(processor.generate_forecast(
+    result = await processor.generate_forecast(
         df=df,
         sku="ENSEMBLE-TEST-001",
         current_stock=100,
         lead_time_days=5,
         forecast_days=7
-    ))
+    )
     
     assert result.success
     assert result.forecast is not None
     assert result.forecast.sku == "ENSEMBLE-TEST-001"
     assert result.forecast.recommended_order >= 0
-    print(f"Ensemble forecast - Model used: {result.forecast.model_used}")
-    print(f"7-day forecast: {result.forecast.forecast_7_day}")
-    print(f"Recommended order: {result.forecast.recommended_order}")
-    print(f"Confidence: {result.forecast.confidence_score:.3f}")
+    vprint(f"Ensemble forecast - Model used: {result.forecast.model_used}")
+    vprint(f"7-day forecast: {result.forecast.forecast_7_day}")
+    vprint(f"Recommended order: {result.forecast.recommended_order}")
+    vprint(f"Confidence: {result.forecast.confidence_score:.3f}")
 
-def test_edge_cases():
+@pytest.mark.asyncio(loop_scope="session")
+async def test_edge_cases(validator, processor):
     """Test edge cases and error handling"""
-    validator = DataValidator()
-    processor = ForecastProcessor()
-    
-    # Test with all zero sales
-    zero_sales = []
-    base_date = datetime.now() - timedelta(days=20)
-    for i in range(15):
-        date_str = (base_date + timedelta(days=i)).strftime("%Y-%m-%d")
-        zero_sales.append(SalesDataPoint(date=date_str, quantity_sold=0))
+    # Test with all zero sales; both paths share the same dates and quantities
+    dates = pd.date_range(start=(datetime.now() - timedelta(days=20)).date(), periods=15, freq='D')
+    quantities = np.zeros(15, dtype=np.int64)
+    zero_sales = [
+        SalesDataPoint(date=date_str, quantity_sold=int(quantity))
+        for date_str, quantity in zip(dates.strftime("%Y-%m-%d"), quantities)
+    ]
     
     result = validator.validate_sales_data(zero_sales)
     assert result.is_valid  # Should still be valid but with warnings
     assert len(result.warnings) > 0
     
-    # Test forecasting with zero sales
-    df = pd.DataFrame([
-        {"date": pd.to_datetime(point.date), "quantity": point.quantity_sold}
-        for point in zero_sales
-    ])
+    # Test forecasting with zero sales; the processor only needs the arrays, not the models
+    df = pd.DataFrame({"date": dates, "quantity": quantities})
     
-    forecast_result = asyncio.run(processor.generate_forecast(
+    forecast_result = await processor.generate_forecast(
         df=df,
         sku="ZERO-SALES-TEST",
         current_stock=50,
         lead_time_days=7
-    ))
+    )
     
     assert forecast_result.success
-    print(f"Zero sales forecast: {forecast_result.forecast.forecast_7_day}")
+    vprint(f"Zero sales forecast: {forecast_result.forecast.forecast_7_day}")
 
-def test_performance_benchmarks():
-    """Test performance with larger datasets"""
-    import time
+# Every metric shares one timestamp, as all records within one tick of the cached clock do
+METRICS_TS = time.time_ns()
+
+def _metrics(i, model="ARIMA", success=True, error=None, timestamp=METRICS_TS):
+    """Forecast metrics for monitor tests; values vary with i so aggregates are distinguishable"""
+    return ForecastMetrics(
+        timestamp=timestamp,
+        sku=f"SKU-{i:03d}",
+        user_id=f"user-{i % 3}",
+        model_used=model,
+        processing_time_ms=10.0 + i,
+        data_points=20 + i,
+        forecast_days=7,
+        confidence_score=0.2 + (i % 7) / 10,
+        data_quality_score=0.4 + (i % 5) / 10,
+        success=success,
+        error_message=error
+    )
+
+@pytest.fixture
+def monitor():
+    return PerformanceMonitor(max_history_size=50)
+
+@pytest.fixture
+def recorded(monitor):
+    """Monitor holding a mix of ARIMA, Prophet and failed forecasts, all applied"""
+    metrics = [
+        _metrics(i, model="ARIMA" if i % 2 else "Prophet", success=i % 6 != 0,
+                 error=None if i % 6 else f"fit failed for item {i}")
+        for i in range(30)
+    ]
+    for m in metrics:
+        monitor.record_forecast_metrics(m)
+    assert monitor.flush(timeout=5)
+    return monitor, metrics
+
+def test_monitor_performance_summary(recorded):
+    """Summary aggregates match a direct computation over the recorded metrics"""
+    monitor, metrics = recorded
+    summary = monitor.get_performance_summary(24)
+    successful = [m for m in metrics if m.success]
+    times = [m.processing_time_ms for m in metrics]
+    
+    assert summary["time_period_hours"] == 24
+    assert summary["total_requests"] == len(metrics)
+    assert summary["successful_requests"] == len(successful)
+    assert summary["failed_requests"] == len(metrics) - len(successful)
+    assert summary["success_rate"] == pytest.approx(len(successful) / len(metrics))
+    assert summary["performance"] == {
+        "avg_processing_time_ms": round(sum(times) / len(times), 2),
+        "max_processing_time_ms": round(max(times), 2),
+        "min_processing_time_ms": round(min(times), 2),
+        "slow_requests": 0
+    }
+    assert summary["forecast_quality"] == {
+        "avg_confidence_score": round(sum(m.confidence_score for m in successful) / len(successful), 3),
+        "avg_data_quality_score": round(sum(m.data_quality_score for m in successful) / len(successful), 3),
+        "low_confidence_forecasts": sum(m.confidence_score < 0.3 for m in successful),
+        "low_quality_data": sum(m.data_quality_score < 0.5 for m in successful)
+    }
+    assert summary["model_usage"] == {
+        "ARIMA": sum(m.model_used == "ARIMA" for m in successful),
+        "Prophet": sum(m.model_used == "Prophet" for m in successful)
+    }
+    assert summary["recent_errors"] == {m.error_message: 1 for m in metrics if not m.success}
+
+def test_monitor_model_comparison(recorded):
+    """Per-model statistics use successful runs only, with sample standard deviations"""
+    monitor, metrics = recorded
+    comparison = monitor.get_model_performance_comparison()
+    
+    assert set(comparison) == {"ARIMA", "Prophet"}
+    for model_name, stats in comparison.items():
+        runs = [m for m in metrics if m.model_used == model_name]
+        ok = [m for m in runs if m.success]
+        confidence = np.array([m.confidence_score for m in ok])
+        quality = np.array([m.data_quality_score for m in ok])
+        
+        assert stats["total_runs"] == len(runs)
+        assert stats["successful_runs"] == len(ok)
+        assert stats["success_rate"] == pytest.approx(len(ok) / len(runs))
+        assert stats["avg_confidence"] == pytest.approx(confidence.mean())
+        assert stats["avg_quality"] == pytest.approx(quality.mean())
+        assert stats["avg_processing_time_ms"] == pytest.approx(np.mean([m.processing_time_ms for m in ok]))
+        assert stats["confidence_std"] == pytest.approx(confidence.std(ddof=1))
+        assert stats["quality_std"] == pytest.approx(quality.std(ddof=1))
+
+def test_model_stats_kernels_agree(rng):
+    """The Numba kernel (when installed) matches the NumPy reference"""
+    confidence, quality, processing_time = rng.random((3, 257))
+    
+    assert model_stats(confidence, quality, processing_time) == pytest.approx(
+        _model_stats_numpy(confidence, quality, processing_time))
+    assert model_stats(confidence[:1], quality[:1], processing_time[:1])[3:] == (0.0, 0.0)
+    assert model_stats(*(np.empty(0),) * 3) == (0.0, 0.0, 0.0, 0.0, 0.0)
+
+def test_monitor_export_metrics(recorded):
+    """Export keeps the ForecastMetrics.to_dict() shape, oldest first"""
+    monitor, metrics = recorded
+    exported = json.loads(monitor.export_metrics())
+    
+    assert len(exported) == len(metrics)
+    for record, m in zip(exported, metrics):
+        expected = m.to_dict()
+        assert record.keys() == expected.keys()
+        assert datetime.fromisoformat(record.pop("timestamp")) == pytest.approx(
+            datetime.fromisoformat(expected.pop("timestamp")), abs=timedelta(milliseconds=1))
+        assert record == pytest.approx(expected)
+    
+    with pytest.raises(ValueError):
+        monitor.export_metrics("csv")
+
+def test_monitor_history_wraps(monitor):
+    """Only the newest max_history_size records are exported, and the intern table stays bounded"""
+    # 230 is not a multiple of the ring size, so the oldest record sits mid-ring
+    for i in range(230):
+        monitor.record_forecast_metrics(_metrics(i, success=i % 5 != 0, error=None if i % 5 else f"error {i}"))
+    assert monitor.flush(timeout=5)
+    
+    exported = json.loads(monitor.export_metrics())
+    assert [record["sku"] for record in exported] == [f"SKU-{i:03d}" for i in range(180, 230)]
+    assert [record["error_message"] for record in exported if not record["success"]] == [
+        f"error {i}" for i in range(180, 230, 5)]
+    assert len(monitor._strings) < 2 * 100
+    assert monitor.get_performance_summary(24)["total_requests"] == 230
+
+def test_monitor_clear_metrics(recorded):
+    monitor, _ = recorded
+    monitor.clear_metrics()
+    
+    assert monitor.get_performance_summary(24) == {"message": "No metrics available for the specified time period"}
+    assert monitor.get_model_performance_comparison() == {}
+    assert monitor.export_metrics() == "[]"
+    assert monitor.error_counts == {}
+    assert monitor._strings == []
+    
+    monitor.record_forecast_metrics(_metrics(0))
+    monitor.flush(timeout=5)
+    assert json.loads(monitor.export_metrics())[0]["sku"] == "SKU-000"
+
+def test_monitor_clear_failure_is_reported(monitor, monkeypatch):
+    """A failing queued task is reported to its caller and leaves the drain thread running"""
+    store = monitor._store
+    monkeypatch.setattr(store, "buckets", None)  # deque.clear() now raises inside _clear
     
-    # Generate large dataset
-    dates = pd.date_range(start='2023-01-01', periods=365, freq='D')
-    quantities = np.random.poisson(10, 365)  # Poisson distribution for sales
+    assert monitor.clear_metrics(timeout=5) is False
+    monkeypatch.undo()
     
-    df = pd.DataFrame({'date': dates, 'quantity': quantities})
+    monitor.record_forecast_metrics(_metrics(0))
+    assert monitor.flush(timeout=5)
+    assert monitor.clear_metrics(timeout=5) is True
+
+def test_monitor_summary_cache(recorded):
+    """Repeated polls reuse the cached summary until a new metric is applied"""
+    monitor, metrics = recorded
+    first = monitor.get_performance_summary(24)
+    assert monitor.get_performance_summary(24) is first
+    
+    monitor.record_forecast_metrics(_metrics(99))
+    monitor.flush(timeout=5)
+    refreshed = monitor.get_performance_summary(24)
+    
+    assert refreshed is not first
+    assert refreshed["total_requests"] == len(metrics) + 1
+
+def test_monitor_summary_window(monitor):
+    """Metrics older than the window fall out of the summary"""
+    two_days_ago = time.time_ns() - 48 * 3600 * 10**9
+    monitor.record_forecast_metrics(_metrics(0, timestamp=two_days_ago))
+    monitor.record_forecast_metrics(_metrics(1))
+    monitor.flush(timeout=5)
+    
+    assert monitor.get_performance_summary(24)["total_requests"] == 1
+    assert monitor.get_performance_summary(72)["total_requests"] == 2
+
+def test_monitor_snapshot(recorded, tmp_path):
+    """snapshot() writes the export as valid JSON and swaps it into place"""
+    monitor, metrics = recorded
+    path = tmp_path / "metrics.json"
+    path.write_text("stale")
     
-    # Test ARIMA performance
-    start_time = time.time()
-    arima_forecaster = ARIMAForecaster()
-    arima_result = arima_forecaster.fit_and_forecast(df, forecast_days=7)
-    arima_time = time.time() - start_time
+    monitor.snapshot(str(path)).result(timeout=5)
     
-    # Test Prophet performance
-    start_time = time.time()
-    prophet_forecaster = ProphetForecaster()
-    prophet_result = prophet_forecaster.fit_and_forecast(df, forecast_days=7)
-    prophet_time = time.time() - start_time
+    assert json.loads(path.read_text()) == json.loads(monitor.export_metrics())
+    assert list(tmp_path.iterdir()) == [path]
+
+def test_monitor_snapshot_failure_cleans_up(recorded, tmp_path, monkeypatch):
+    """A failed snapshot removes its temp file and leaves the previous snapshot alone"""
+    monitor, metrics = recorded
+    path = tmp_path / "metrics.json"
+    path.write_text("previous")
+    
+    def failing_iter_json(history, strings):
+        yield b"["
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(monitor, "_iter_json", failing_iter_json)
+    with pytest.raises(OSError):
+        monitor.snapshot(str(path)).result(timeout=5)
+    
+    assert path.read_text() == "previous"
+    assert list(tmp_path.iterdir()) == [path]
+
+def test_quartiles_are_order_statistics(rng):
+    """_quartiles selects the n//4 and 3n//4 order statistics without sorting"""
+    for quantities in (np.arange(1, 9), rng.integers(0, 100, 37), np.full(5, 3)):
+        ordered = np.sort(quantities)
+        n = quantities.size
+        assert DataValidator._quartiles(quantities.copy()) == (ordered[n // 4], ordered[(3 * n) // 4])
+
+def test_select_best_forecast(processor):
+    """Model selection picks the failed model's counterpart, a clear winner, or an ensemble"""
+    from models.forecasting_models import ForecastResult
+    
+    def pair(arima_confidence, prophet_confidence, prophet_seasonal):
+        arima = ForecastResult(np.full(7, 10.0), model_name="ARIMA", confidence_score=arima_confidence)
+        prophet = ForecastResult(np.full(7, 20.0), model_name="Prophet", confidence_score=prophet_confidence,
+                                 seasonality_detected=prophet_seasonal)
+        return processor._select_best_forecast(arima, prophet)
+    
+    assert pair(0.0, 0.6, False).model_name == "Prophet"  # ARIMA failed
+    assert pair(0.5, 0.0, False).model_name == "ARIMA"    # Prophet failed
+    assert pair(0.5, 0.8, True).model_name == "Prophet"   # Prophet clearly better and seasonal
+    assert pair(0.8, 0.5, False).model_name == "ARIMA"    # ARIMA clearly better
+    
+    # Prophet better but without seasonality, or too close to call: average both models
+    for ensemble in (pair(0.5, 0.8, False), pair(0.5, 0.52, True)):
+        assert ensemble.model_name == "Ensemble-ARIMA-Prophet"
+        assert np.allclose(ensemble.predictions, 15.0)
+    assert pair(0.5, 0.52, True).confidence_score == pytest.approx(0.51)
+
+def _fit_arima(df):
+    """Fit ARIMA in a worker process, returning (result, elapsed) timed inside the worker"""
+    start_time = time.perf_counter()
+    result = ARIMAForecaster().fit_and_forecast(df, forecast_days=7)
+    return result, time.perf_counter() - start_time
+
+def _fit_prophet(df):
+    """Fit Prophet in a worker process, returning (result, elapsed) timed inside the worker"""
+    start_time = time.perf_counter()
+    result = ProphetForecaster().fit_and_forecast(df, forecast_days=7)
+    return result, time.perf_counter() - start_time
+
+@pytest.mark.slow
+@pytest.mark.xdist_group("benchmark")
+def test_performance_benchmarks(big_df):
+    """Test performance with larger datasets"""
+    # Both fits are CPU-bound, so run them side by side in separate processes
+    with ProcessPoolExecutor(max_workers=2) as ex:
+        arima_future = ex.submit(_fit_arima, big_df)
+        prophet_future = ex.submit(_fit_prophet, big_df)
+        arima_result, arima_time = arima_future.result()
+        prophet_result, prophet_time = prophet_future.result()
     
-    print(f"ARIMA processing time: {arima_time:.2f}s")
-    print(f"Prophet processing time: {prophet_time:.2f}s")
+    vprint(f"ARIMA processing time: {arima_time:.2f}s")
+    vprint(f"Prophet processing time: {prophet_time:.2f}s")
     
     assert arima_time < 30  # Should complete within 30 seconds
     assert prophet_time < 60  # Prophet might take longer but should be reasonable
 
 if __name__ == "__main__":
-    # Run comprehensive tests
-    print("Running comprehensive forecasting service tests...")
-    
-    try:
-        test_data_validator()
-        print("✓ Basic data validator test passed")
-        
-        test_advanced_data_validation()
-        print("✓ Advanced data validation test passed")
-        
-        test_anomaly_detection()
-        print("✓ Anomaly detection test passed")
-        
-        test_arima_forecaster()
-        print("✓ Basic ARIMA forecaster test passed")
-        
-        test_arima_advanced_features()
-        print("✓ Advanced ARIMA features test passed")
-        
-        test_prophet_advanced_features()
-        print("✓ Advanced Prophet features test passed")
-        
-        test_forecast_processor()
-        print("✓ Basic forecast processor test passed")
-        
-        test_ensemble_forecasting()
-        print("✓ Ensemble forecasting test passed")
-        
-        test_forecast_request_validation()
-        print("✓ API model validation test passed")
-        
-        test_edge_cases()
-        print("✓ Edge cases test passed")
-        
-        test_performance_benchmarks()
-        print("✓ Performance benchmarks test passed")
-        
-        print("\n🎉 All comprehensive tests passed! Advanced forecasting service is working correctly.")
-        print("\nFeatures tested:")
-        print("- Advanced ARIMA with automatic parameter selection")
-        print("- Prophet with custom seasonalities and regressors")
-        print("- Comprehensive data quality assessment")
-        print("- Anomaly detection and outlier analysis")
-        print("- Ensemble forecasting with model selection")
-        print("- Performance optimization")
-        print("- Edge case handling")
-        
-    except Exception as e:
-        print(f"✗ Test failed: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise
\ No newline at end of file
+    # Run through pytest so fixtures, markers and the session event loop behave as under CI
+    raise SystemExit(pytest.main([__file__, "-x", "-q"]))